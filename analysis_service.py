@@ -0,0 +1,245 @@
+"""Background analysis service for the Blog SEO Analyzer.
+
+Analyses run on a worker pool behind a small JSON API, independent of any Streamlit
+session. Requests for a URL that is already queued or running join that job instead of
+starting another one:
+
+    python analysis_service.py --port 8600 --workers 4
+
+    POST /jobs                {"url": "..."}   -> 202 {"id": ..., "status": "queued", ...}
+    GET  /jobs/<id>?wait=10                    -> job status and the partial result so far;
+                                                  waits up to 10 s for progress after ?version=
+    GET  /jobs/<id>/result                     -> 200 with the result, 202 while still running
+
+Set ANALYSIS_SERVICE_URL=http://127.0.0.1:8600 to make the Streamlit app a client of it.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import blog_seo_analyzer as analyzer
+import seo_batch
+from pipeline_metrics import count
+
+MAX_WAIT_SECONDS = 30  # Longest a status request may block waiting for progress
+FINISHED = ("done", "failed")
+PARTIAL_KEYS = ("url", "readability", "onpage", "sections", "in_progress")  # What a progress view renders
+
+
+def snapshot(partial):
+    """Copies what a progress view needs from a partial result, which the worker keeps changing."""
+    view = {key: partial[key] for key in PARTIAL_KEYS if key in partial}
+    view["sections"] = {key: list(lines) for key, lines in partial["sections"].items()}
+    return view
+
+
+class Job:
+    """One analysis of one URL; `version` increases whenever its status or partial result changes."""
+
+    def __init__(self, url):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.status = "queued"
+        self.version = 0
+        self.created_at = time.time()
+        self.finished_at = None
+        self.partial = None
+        self.result = None
+        self.error = None
+
+    def describe(self):
+        """Status view for the API, with the partial result so far."""
+        return {
+            "id": self.id,
+            "url": self.url,
+            "status": self.status,
+            "version": self.version,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "partial": self.partial,
+        }
+
+
+class AnalysisService:
+    """Job queue with a worker pool and per-URL request coalescing.
+
+    The latest result of every URL is kept (up to `max_results`) and passed to the next
+    analysis of that URL, so unchanged sections are reused rather than sent to the LLM
+    again. Finished jobs are forgotten after `job_ttl` seconds.
+    """
+
+    def __init__(self, llm, workers=4, store=None, job_ttl=3600, max_results=500):
+        self.llm = llm
+        self.store = store
+        self.job_ttl = job_ttl
+        self.max_results = max_results
+        self._jobs = {}
+        self._active = {}  # URL -> queued or running job
+        self._latest = {}  # URL -> latest successful result
+        self._queue = queue.Queue()
+        self._changed = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"analysis-worker-{n}", daemon=True) for n in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, url):
+        """Returns (job, coalesced): the in-flight job for `url` if there is one, otherwise a new queued job."""
+        with self._changed:
+            self._prune()
+            job = self._active.get(url)
+            if job is not None:
+                count("service_jobs_coalesced")
+                return job, True
+            job = Job(url)
+            self._jobs[job.id] = job
+            self._active[url] = job
+        count("service_jobs_submitted")
+        self._queue.put(job)
+        return job, False
+
+    def get(self, job_id):
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def wait(self, job, version, timeout):
+        """Blocks until the job's version differs from `version`, it finishes, or `timeout` passes."""
+        with self._changed:
+            self._changed.wait_for(lambda: job.version != version or job.status in FINISHED, timeout)
+            return job.describe()
+
+    def _update(self, job, **changes):
+        with self._changed:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.version += 1
+            self._changed.notify_all()
+
+    def _prune(self):
+        cutoff = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            self._update(job, status="running")
+            with self._changed:
+                previous = self._latest.get(job.url)
+            try:
+                record = seo_batch.analyze_page(
+                    job.url, self.llm, on_update=lambda partial: self._update(job, partial=snapshot(partial)),
+                    previous=previous,
+                )
+            except Exception as e:  # analyze_page reports its own errors; this guards the worker
+                analyzer.log_error(f"Error in analysis job for {job.url}", e)
+                record = {"url": job.url, "status": "error", "error": str(e)}
+
+            if self.store:
+                self.store.add(record, source="service")
+            ok = record["status"] in ("ok", "partial")
+            with self._changed:
+                if ok:
+                    self._latest.pop(job.url, None)
+                    self._latest[job.url] = record
+                    while len(self._latest) > self.max_results:
+                        self._latest.pop(next(iter(self._latest)))
+                if self._active.get(job.url) is job:
+                    del self._active[job.url]
+            self._update(
+                job,
+                status="done" if ok else "failed",
+                result=record if ok else None,
+                error=None if ok else record.get("error") or record["status"],
+                finished_at=time.time(),
+            )
+
+
+def make_handler(service):
+    class AnalysisHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if urlparse(self.path).path.rstrip("/") != "/jobs":
+                self.send_error(404)
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                url = request["url"].strip()
+            except (ValueError, KeyError, AttributeError):
+                self._send_json(400, {"error": 'Expected a JSON body like {"url": "https://..."}'})
+                return
+            if urlparse(url).scheme not in ("http", "https"):
+                self._send_json(400, {"error": "url must be an http(s) URL"})
+                return
+            job, coalesced = service.submit(url)
+            self._send_json(202, {**job.describe(), "coalesced": coalesced})
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            parts = [part for part in parsed.path.split("/") if part]
+            job = service.get(parts[1]) if len(parts) in (2, 3) and parts[0] == "jobs" else None
+            if job is None or (len(parts) == 3 and parts[2] != "result"):
+                self.send_error(404)
+                return
+            if len(parts) == 3:
+                if job.status == "done":
+                    self._send_json(200, job.result)
+                elif job.status == "failed":
+                    self._send_json(502, {"error": job.error})
+                else:
+                    self._send_json(202, {"status": job.status})
+                return
+
+            query = parse_qs(parsed.query)
+            try:
+                wait = min(float(query.get("wait", ["0"])[0]), MAX_WAIT_SECONDS)
+                version = int(query.get("version", ["-1"])[0])
+            except ValueError:
+                self._send_json(400, {"error": "wait and version must be numbers"})
+                return
+            self._send_json(200, service.wait(job, version, wait) if wait > 0 else job.describe())
+
+        def log_message(self, format, *args):
+            pass
+
+    return AnalysisHandler
+
+
+def serve(service, host="127.0.0.1", port=8600):
+    """Serves the job API until interrupted."""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Blog SEO analyses in the background behind a JSON API.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=4, help="Analyses run concurrently")
+    args = parser.parse_args(argv)
+
+    service = AnalysisService(analyzer.get_llm_client(), workers=args.workers, store=analyzer.get_results_store())
+    print(f"Serving analyses on http://{args.host}:{args.port}/jobs with {args.workers} workers")
+    serve(service, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Micro-benchmark of the precompiled TextCleaner against the original regex-per-rule cleaner.
+
+    python benchmarks/bench_cleaning.py --words 10000 50000 --repeat 5
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_cleaner import TextCleaner  # noqa: E402
+from corpus import WORDS  # noqa: E402
+
+NOISE = ["(see note)", "[1]", "\u2014", "\u2013", "\u200b", "\u2605", "\u201cquoted\u201d", "it's", "e-mail", "50%",
+         "Lorem ipsum dolor sit.", "\u2009", "\u3000", "naïve"]
+
+
+def legacy_clean(content, url=None):
+    """The original clean_placeholder_text: one re.sub per rule, recompiled with IGNORECASE each call."""
+    unwanted_patterns = [
+        r'Lorem ipsum.*?(\.|。)',
+        r'Sample content.*?(\.|。)',
+        r'[\u2000-\u206F\uFEFF]',
+        r'[^\w\s.,!?\'\-\u2013/]',
+        r'\[.*?\]',
+        r'\(.*?\)'
+    ]
+    for pattern in unwanted_patterns:
+        content = re.sub(pattern, '', content, flags=re.IGNORECASE)
+    content = content.replace("\u2013", "-")
+    content = content.replace("\u2014", "-")
+    content = re.sub(r'\s+', ' ', content).strip()
+    return content.strip()
+
+
+def make_document(words, seed=0):
+    rng = random.Random(seed)
+    tokens = []
+    for i in range(words):
+        tokens.append(rng.choice(NOISE) if i % 17 == 0 else rng.choice(WORDS))
+        if i % 12 == 11:
+            tokens[-1] += "."
+    return " ".join(tokens)
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'words':>8} {'legacy ms':>10} {'cold ms':>10} {'memo ms':>10} {'speedup':>8}  same output")
+    for words in args.words:
+        document = make_document(words)
+        cleaner = TextCleaner()
+        cold_cleaner = TextCleaner(cache_size=0)
+        legacy = best_of(lambda: legacy_clean(document), args.repeat)
+        cold = best_of(lambda: cold_cleaner.clean(document), args.repeat)
+        cleaner.clean(document)
+        memo = best_of(lambda: cleaner.clean(document), args.repeat)
+        same = legacy_clean(document) == cold_cleaner.clean(document)
+        print(f"{words:>8} {legacy:>10.2f} {cold:>10.2f} {memo:>10.3f} {legacy / cold:>7.2f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Import-time budget check for the analyzer module, measured in fresh interpreters.
+
+    python benchmarks/bench_import.py --runs 5 --budget-ms 800
+
+Exits with status 1 when the median import time exceeds the budget, so it can gate CI.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module):
+    """Imports `module` in a fresh interpreter and returns (total_us, {direct import: cumulative_us})."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True,
+    )
+    total = 0
+    children, pending = {}, {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            pending[name.strip()] = int(cumulative)  # Children are listed before their parent
+        elif depth == 0:
+            if name.strip() == module:
+                total, children = int(cumulative), pending
+            pending = {}
+    return total, children
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the import time of the analyzer module.")
+    parser.add_argument("--module", default="blog_seo_analyzer")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=800.0)
+    parser.add_argument("--top", type=int, default=10, help="Slowest direct imports of the module to list")
+    args = parser.parse_args(argv)
+
+    totals = []
+    slowest = {}
+    for _ in range(args.runs):
+        total, children = import_profile(args.module)
+        totals.append(total / 1000)
+        for name, cumulative in children.items():
+            slowest.setdefault(name, []).append(cumulative / 1000)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.1f} ms, min {min(totals):.1f} ms, max {max(totals):.1f} ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    ranked = sorted(slowest.items(), key=lambda item: -statistics.median(item[1]))[:args.top]
+    for name, values in ranked:
+        print(f"  {name:40s} {statistics.median(values):>8.1f} ms")
+    if median > args.budget_ms:
+        print("over budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
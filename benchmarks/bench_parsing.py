@@ -0,0 +1,81 @@
+"""Compares the legacy multi-pass HTML extraction with the single-pass extractor per parser backend.
+
+    python benchmarks/bench_parsing.py --corpus path/to/saved/html --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import blog_seo_analyzer as analyzer  # noqa: E402
+from corpus import load_corpus  # noqa: E402
+
+
+def legacy_extract(html, url):
+    """The original extraction path: html.parser, decompose, find_all, then get_text for links."""
+    soup = BeautifulSoup(html, "html.parser")
+    for element in soup.select('aside, div[id*="sidebar"]'):
+        element.decompose()
+    for element in soup.select("footer"):
+        element.decompose()
+    elements = soup.find_all(["p", "h1", "h2", "h3", "h4", "h5", "h6", "li"])
+    content = analyzer.clean_placeholder_text(" ".join(elem.text for elem in elements), url)
+    title = soup.title.string.strip() if soup.title else "No title found"
+    meta_tag = soup.find("meta", {"name": "description"}) or soup.find("meta", {"property": "og:description"})
+    meta_description = meta_tag["content"].strip() if meta_tag else "No meta description found"
+    page_text = soup.get_text(separator=" ", strip=True)
+    return content, title, meta_description, page_text
+
+
+def single_pass_extract(html, url, parser):
+    return analyzer.retrieve_blog_content(url, BeautifulSoup(html, parser))
+
+
+def available_parsers():
+    parsers = ["html.parser"]
+    for name, module in (("lxml", "lxml"), ("html5lib", "html5lib")):
+        try:
+            __import__(module)
+            parsers.append(name)
+        except ImportError:
+            pass
+    return parsers
+
+
+def time_per_page(func, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name, html in corpus:
+            func(html, f"https://example.com/{name}")
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="Directory of saved .html files (synthetic pages if omitted)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    analyzer.get_text_cleaner().cache_size = 0  # Repeated runs would otherwise only measure memo hits
+    size_kb = sum(len(html) for _, html in corpus) / len(corpus) / 1024
+    print(f"{len(corpus)} pages, {size_kb:.0f} KB average")
+
+    baseline = time_per_page(legacy_extract, corpus, args.repeat)
+    print(f"{'legacy (html.parser, multi-pass)':40s} {baseline:8.2f} ms/page")
+    for backend in available_parsers():
+        elapsed = time_per_page(lambda html, url: single_pass_extract(html, url, backend), corpus, args.repeat)
+        print(f"{f'single-pass ({backend})':40s} {elapsed:8.2f} ms/page  {baseline / elapsed:5.2f}x")
+    for backend in available_parsers():
+        elapsed = time_per_page(lambda html, url: BeautifulSoup(html, backend), corpus, args.repeat)
+        print(f"{f'parse only ({backend})':40s} {elapsed:8.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Offline end-to-end benchmark: local HTTP fixture server, deterministic fake LLM, no network.
+
+    python benchmarks/bench_pipeline.py --corpus saved_pages/ --workers 8 --llm-latency 0.5 --json bench.json
+
+Reports throughput, p50/p95 latency per stage and end to end, and peak traced memory per stage.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import redirect_stderr
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+# The benchmark measures the pipeline itself, so persistent caches and live link checks are off
+os.environ.setdefault("LLM_CACHE_PATH", "")
+os.environ.setdefault("PAGE_CACHE_DIR", "")
+os.environ.setdefault("LINK_CHECK", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import blog_seo_analyzer as analyzer  # noqa: E402
+import seo_batch  # noqa: E402
+from corpus import load_corpus  # noqa: E402
+
+
+class FakeLLM:
+    """Deterministic stand-in for the Gemini chat model with configurable latency.
+
+    It answers every guideline listed in the prompt's format section with a fixed line,
+    so the downstream parsing and rendering run exactly as with real responses.
+    """
+
+    def __init__(self, latency=0.5, jitter=0.1):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _respond(self, prompt):
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        delay = max(0.0, self.latency + random.Random(seed).uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+        with self._lock:
+            self.calls += 1
+        labels = [
+            line.split(":", 1)[0].strip()
+            for line in prompt.splitlines()
+            if "Suggestions:" in line and ":" in line.split("Suggestions:", 1)[0]
+        ]
+        return "\n".join(
+            f"{label}: The content meets this guideline in most places. Suggestions: Review the {label.lower()} once more."
+            for label in dict.fromkeys(labels)
+        )
+
+    def invoke(self, prompt, **kwargs):
+        return SimpleNamespace(content=self._respond(prompt))
+
+    def stream(self, prompt, **kwargs):
+        for line in self._respond(prompt).splitlines(keepends=True):
+            yield SimpleNamespace(content=line)
+
+
+def serve_corpus(corpus):
+    """Serves corpus pages from memory at http://127.0.0.1:<port>/<name> and returns the server."""
+    pages = {f"/{name}": html.encode("utf-8") for name, html in corpus}
+
+    class CorpusHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = pages.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_HEAD = do_GET
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CorpusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class RecordSink:
+    """File-like target for `run_batch` that keeps the JSONL records in memory."""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def write(self, line):
+        if line.strip():
+            with self._lock:
+                self.records.append(json.loads(line))
+
+    def flush(self):
+        pass
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def stage_memory(url, llm):
+    """Runs one page stage by stage and returns the peak traced memory (MB) of each stage."""
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for stage in ("fetch_parse", "extract", "analysis"):
+            tracemalloc.reset_peak()
+            if stage == "fetch_parse":
+                soup = analyzer.scrape_page_content(url)
+            elif stage == "extract":
+                page = analyzer.retrieve_blog_content(url, soup)
+            else:
+                analyzer.run_analysis(page, url, llm)
+            peaks[stage] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def run(corpus, workers, llm_latency, llm_jitter, llm_concurrency, memory_samples):
+    server = serve_corpus(corpus)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/{name}" for name, _ in corpus]
+    fake = FakeLLM(llm_latency, llm_jitter)
+    analyzer.get_llm = lambda: fake  # seo_batch.build_llm wraps it in ResilientLLM (rate limits, retries, breaker)
+
+    sink = RecordSink()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as progress, redirect_stderr(progress):
+        seo_batch.run_batch(urls, sink, workers=workers, llm_concurrency=llm_concurrency, llm_rpm=0)
+    elapsed = time.perf_counter() - start
+    end_to_end_peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+
+    records = sink.records
+    stage_latency = {}
+    for record in records:
+        for name, summary in record["metrics"]["observations"].items():
+            if name.endswith("_seconds"):
+                stage_latency.setdefault(name[: -len("_seconds")], []).append(summary["sum"])
+
+    memory = {}
+    for url in urls[:memory_samples]:
+        for stage, peak in stage_memory(url, fake).items():
+            memory[stage] = max(memory.get(stage, 0.0), peak)
+
+    server.shutdown()
+    return {
+        "pages": len(urls),
+        "ok": sum(record["status"] == "ok" for record in records),
+        "llm_calls": fake.calls,
+        "elapsed_seconds": elapsed,
+        "throughput_pages_per_second": len(urls) / elapsed if elapsed else 0.0,
+        "end_to_end": {
+            "p50": percentile([record["elapsed_seconds"] for record in records], 50),
+            "p95": percentile([record["elapsed_seconds"] for record in records], 95),
+            "peak_memory_mb": end_to_end_peak,
+        },
+        "stages": {
+            stage: {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+            for stage, values in sorted(stage_latency.items())
+        },
+        "stage_peak_memory_mb": memory,
+    }
+
+
+def print_report(report):
+    print(f"{report['pages']} pages ({report['ok']} ok), {report['llm_calls']} LLM calls, "
+          f"{report['elapsed_seconds']:.2f}s, {report['throughput_pages_per_second']:.2f} pages/s")
+    end_to_end = report["end_to_end"]
+    print(f"end to end: p50 {end_to_end['p50'] * 1000:.1f} ms, p95 {end_to_end['p95'] * 1000:.1f} ms, "
+          f"peak memory {end_to_end['peak_memory_mb']:.1f} MB")
+    print(f"{'stage (time per page)':40s} {'p50 ms':>10} {'p95 ms':>10}")
+    for stage, latency in report["stages"].items():
+        print(f"{stage:40s} {latency['p50'] * 1000:>10.2f} {latency['p95'] * 1000:>10.2f}")
+    print(f"{'stage':40s} {'peak MB':>10}")
+    for stage, peak in report["stage_peak_memory_mb"].items():
+        print(f"{stage:40s} {peak:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark with a fake LLM.")
+    parser.add_argument("--corpus", help="Directory of saved .html files (synthetic pages if omitted)")
+    parser.add_argument("--pages", type=int, default=20, help="Synthetic pages to generate without --corpus")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mean fake LLM latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--memory-samples", type=int, default=3, help="Pages profiled stage by stage for memory")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus, count=args.pages)
+    report = run(corpus, args.workers, args.llm_latency, args.llm_jitter, args.llm_concurrency, args.memory_samples)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Loads saved blog HTML for the benchmarks, falling back to a synthetic corpus."""
+import glob
+import os
+import random
+
+WORDS = (
+    "search engine optimization content keyword ranking blog readers traffic strategy "
+    "marketing audience headline article guide example practice results quality links "
+    "website page google analytics conversion improve simple write publish update"
+).split()
+
+
+def _sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 24))]
+    return " ".join(words).capitalize() + "."
+
+
+def generate_blog_html(index, sections=12, paragraphs=4, script_kb=40):
+    """Builds a deterministic, script-heavy blog page resembling a real WordPress post."""
+    rng = random.Random(index)
+    script = "var data = [" + ",".join(str(rng.random()) for _ in range(script_kb * 50)) + "];"
+    body = []
+    for section in range(sections):
+        body.append(f"<h2>Section {section}: {_sentence(rng)}</h2>")
+        for _ in range(paragraphs):
+            body.append(f"<p>{' '.join(_sentence(rng) for _ in range(4))} <a href='/post-{rng.randint(1, 500)}'>related post</a></p>")
+        body.append("<ul>" + "".join(f"<li>{_sentence(rng)}</li>" for _ in range(4)) + "</ul>")
+    nav = "".join(f"<li><a href='/category/{word}'>{word}</a></li>" for word in WORDS[:15])
+    sidebar = "".join(f"<p><a href='https://partner{n}.example.org/'>Partner {n}</a></p>" for n in range(20))
+    return f"""<!DOCTYPE html><html><head><title>Blog post {index}: {_sentence(rng)}</title>
+<meta name="description" content="{_sentence(rng)}"><script>{script}</script><style>body {{ margin: 0; }}</style></head>
+<body><header><nav><ul>{nav}</ul></nav></header><article><h1>Blog post {index}</h1>{''.join(body)}</article>
+<aside id="sidebar">{sidebar}</aside><footer><p>Copyright {index}</p></footer></body></html>"""
+
+
+def load_corpus(directory=None, count=20):
+    """Returns (name, html) pairs from `directory`, or `count` synthetic pages if it has no HTML files."""
+    paths = sorted(glob.glob(os.path.join(directory, "*.html"))) if directory else []
+    if paths:
+        corpus = []
+        for path in paths:
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                corpus.append((os.path.basename(path), handle.read()))
+        return corpus
+    return [(f"synthetic-{index}.html", generate_blog_html(index)) for index in range(count)]
@@ -1,27 +1,111 @@
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup
-from langchain_google_genai.chat_models import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-import spacy
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
 import logging
-import textstat
 from collections import Counter
 import re  # Added for regex operations
 from urllib.parse import urlparse, urljoin
 import os
+import hashlib
+import queue
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from dotenv import load_dotenv
+from llm_cache import LLMResponseCache
+from results_store import ResultsStore
+from llm_client import CircuitBreaker, CircuitOpenError, ResilientLLM
+from page_fetcher import PageFetcher
+from process_singletons import process_singleton
+from text_cleaner import TextCleaner
+from link_analyzer import LinkChecker, build_link_report
+from keyword_extractor import KeywordExtractor, summarize_keyword_stats
+from onpage_metrics import compute_onpage_metrics, onpage_findings
+from readability_engine import ReadabilityEngine
+from structured_analysis import build_combined_prompt, parse_structured_response, response_schema
+from section_tree import build_section_tree, group_sections, section_text
+from pipeline_metrics import METRICS, PipelineMetrics, count, current_trace, observe, serve_metrics, timed, tracing
+from prompt_budget import chunk_text, compact_text, estimate_tokens, merge_guideline_lines
+from functools import partial
 
 # Constants
 load_dotenv()
 API_KEY =  os.getenv("GOOGLE_API_KEY") # Replace with your actual API key
 LLM_MODEL = "gemini-2.0-flash-exp"
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+SPACY_DISABLED_PIPES = ["ner"]  # Keyword extraction only needs tokens, lemmas and noun chunks
+KEYWORD_BATCH_SIZE = int(os.getenv("KEYWORD_BATCH_SIZE", "64"))  # Texts per nlp.pipe batch
+KEYWORD_N_PROCESS = int(os.getenv("KEYWORD_N_PROCESS", "1"))  # nlp.pipe worker processes
+MAX_CACHED_ANALYSES = 20  # Analysis results kept per Streamlit session
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "3"))  # Parallel LLM calls per analysis
+LLM_TOKEN_BUDGET = int(os.getenv("LLM_TOKEN_BUDGET", "8000"))  # Estimated tokens of page content per prompt
+LLM_SECTION_GROUP_TOKENS = int(os.getenv("LLM_SECTION_GROUP_TOKENS", "2000"))  # Sections per content quality prompt
+LLM_STREAMING = os.getenv("LLM_STREAMING", "1") != "0"  # Stream guideline lines into the UI as they arrive
+# "sections": one prompt per analysis section; "combined": one structured JSON call, falling back to sections
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "sections")
+
+# Gemini quota and failure handling, shared by every session in the process
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))  # 0 = unlimited
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))  # Estimated prompt tokens, 0 = unlimited
+LLM_PROCESS_CONCURRENCY = int(os.getenv("LLM_PROCESS_CONCURRENCY", "8"))  # In-flight LLM calls across sessions
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))  # Retries for rate limits and transient errors
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))  # Consecutive failures that open the circuit
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))  # Seconds before a trial call is let through
+
+# LLM response cache settings (set LLM_CACHE_PATH to an empty string to disable)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # Seconds
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Background analysis service (see analysis_service.py); when set, the app submits jobs to it instead of analyzing
+ANALYSIS_SERVICE_URL = os.getenv("ANALYSIS_SERVICE_URL", "").rstrip("/")
+ANALYSIS_SERVICE_WAIT = 10  # Seconds each status request waits for progress
+
+# Run history for trend queries (set RESULTS_DB_PATH to an empty string to disable)
+RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", "results.sqlite3")
+
+# Page fetching settings (set PAGE_CACHE_DIR to an empty string to disable the page cache)
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "page_cache")
+FETCH_POOL_SIZE = int(os.getenv("FETCH_POOL_SIZE", "32"))  # Keep-alive connections per host
+FETCH_RETRIES = int(os.getenv("FETCH_RETRIES", "3"))
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(5 * 1024 * 1024)))  # 0 for no limit
+
+# Link status checking (set LINK_CHECK=0 to skip the HEAD requests)
+LINK_CHECK = os.getenv("LINK_CHECK", "1") != "0"
+LINK_CHECK_TIMEOUT = float(os.getenv("LINK_CHECK_TIMEOUT", "5"))
+LINK_CHECK_PER_HOST = int(os.getenv("LINK_CHECK_PER_HOST", "4"))  # Concurrent checks per host
+LINK_CHECK_MAX = int(os.getenv("LINK_CHECK_MAX", "100"))  # Links checked per page
+
+# Metrics export: JSON snapshot written after each analysis and/or a Prometheus /metrics endpoint
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")  # Set to 0.0.0.0 to let other machines scrape the endpoint
+DEBUG_PROMPTS = os.getenv("DEBUG_PROMPTS", "0") == "1"  # Print every prompt's input text to stdout
+
+# Site-specific cleaning rules: JSON mapping host names to lists of regexes to remove
+CLEANING_RULES_PATH = os.getenv(
+    "CLEANING_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cleaning_rules.json")
+)
 
-# Initialize LLM
-llm = ChatGoogleGenerativeAI(api_key=API_KEY, model=LLM_MODEL)
-
-# Load Spacy NLP model
-nlp = spacy.load("en_core_web_sm")
+# HTML parser backend: "auto" picks lxml when installed, otherwise the pure-Python "html.parser"
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER", "auto")
+CONTENT_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li"}  # Tags whose text forms the blog content
+
+# Bump a version whenever its prompt template changes so stale cached responses are not reused
+PROMPT_VERSIONS = {
+    "keyword_optimization": "3",
+    "content_quality": "2",
+    "link_evaluation": "2",
+    "combined": "2",
+}
+
+# LLM-backed analysis sections: (key, analysis expander title, suggestions expander title)
+ANALYSIS_SECTIONS = [
+    ("keyword_optimization", "Keyword Optimization Analysis", "Keyword Optimization Suggestions"),
+    ("content_quality", "Content Evaluation Analysis", "Content Evaluation Suggestions"),
+    ("link_evaluation", "Link Evaluation", "Link Evaluation Suggestions"),
+]
 
 # Configure logging
 logging.basicConfig(level=logging.ERROR, filename="error_log.txt")
@@ -31,109 +115,382 @@ def log_error(message, error):
     """Logs error messages to a file."""
     logging.error(f"{message}: {error}")
 
+def report_error(message):
+    """Shows an error in the Streamlit UI when running inside a script run; a no-op in batch mode."""
+    if get_script_run_ctx(suppress_warning=True) is not None:
+        st.error(message)
+
+def describe_llm_error(action, error):
+    """Formats an LLM failure for the UI, explaining a paused circuit instead of showing the raw exception."""
+    if isinstance(error, CircuitOpenError):
+        return f"{action}: the AI service is failing repeatedly, so requests are paused briefly. Please try again in a moment."
+    return f"{action}: {error}"
+
+@process_singleton
+def get_llm():
+    """Returns the process-wide Gemini chat model, importing the client on first use."""
+    from langchain_google_genai.chat_models import ChatGoogleGenerativeAI
+
+    # A single attempt: the client's own retries would also retry 403s and multiply under ResilientLLM
+    return ChatGoogleGenerativeAI(api_key=API_KEY, model=LLM_MODEL, max_retries=1)
+
+@process_singleton
+def get_llm_client():
+    """Returns the process-wide rate-limited, retrying call layer around the chat model."""
+    return ResilientLLM(
+        get_llm(),
+        requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+        max_concurrency=LLM_PROCESS_CONCURRENCY,
+        max_retries=LLM_MAX_RETRIES,
+        breaker=CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET),
+    )
+
+@process_singleton
+def get_nlp():
+    """Returns the process-wide spaCy pipeline, loaded on first use with unused pipes disabled."""
+    import spacy
+
+    return spacy.load(SPACY_MODEL, disable=SPACY_DISABLED_PIPES)
+
+@process_singleton
+def get_keyword_extractor():
+    """Returns the process-wide keyword extractor backed by the shared spaCy pipeline."""
+    return KeywordExtractor(get_nlp(), batch_size=KEYWORD_BATCH_SIZE, n_process=KEYWORD_N_PROCESS)
+
+@process_singleton
+def get_readability_engine():
+    """Returns the process-wide readability engine, whose syllable and score caches all sessions share."""
+    return ReadabilityEngine()
+
+@process_singleton
+def get_llm_cache():
+    """Returns the process-wide LLM response cache, or None if caching is disabled."""
+    if not LLM_CACHE_PATH:
+        return None
+    return LLMResponseCache(LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL, max_bytes=LLM_CACHE_MAX_BYTES)
+
+@process_singleton
+def get_results_store():
+    """Returns the process-wide run history store, or None if it is disabled."""
+    if not RESULTS_DB_PATH:
+        return None
+    return ResultsStore(RESULTS_DB_PATH)
+
+@process_singleton
+def get_page_fetcher():
+    """Returns the process-wide pooled page fetcher."""
+    return PageFetcher(
+        PAGE_CACHE_DIR or None, pool_size=FETCH_POOL_SIZE, retries=FETCH_RETRIES, max_bytes=FETCH_MAX_BYTES
+    )
+
+@process_singleton
+def get_link_checker():
+    """Returns the process-wide link checker, sharing the page fetcher's pooled connections."""
+    return LinkChecker(
+        get_page_fetcher().session, timeout=LINK_CHECK_TIMEOUT, per_host_limit=LINK_CHECK_PER_HOST
+    )
+
+@process_singleton
+def start_metrics_endpoint():
+    """Starts the Prometheus metrics endpoint once per process when METRICS_PORT is set."""
+    return serve_metrics(METRICS_PORT, host=METRICS_HOST) if METRICS_PORT else None
+
+def export_metrics():
+    """Writes the process-wide metrics snapshot to METRICS_FILE, if configured."""
+    if METRICS_FILE:
+        try:
+            METRICS.write_json(METRICS_FILE)
+        except OSError as e:
+            log_error("Error writing metrics file", e)
+
+def invoke_llm(llm, prompt, prompt_version, on_line=None, **invoke_kwargs):
+    """Invokes the LLM through the persistent response cache and returns the response text.
+
+    With `on_line`, the response is streamed and each complete line is passed to it as soon
+    as it arrives; cached responses are replayed line by line. `invoke_kwargs` (such as a
+    response schema) must be fixed for a given prompt version, because they are not part of
+    the cache key.
+    """
+    observe("llm_prompt_chars", len(prompt))
+    observe("llm_prompt_tokens", estimate_tokens(prompt))
+    cache = get_llm_cache()
+    key = None
+    if cache:
+        key = cache.make_key(LLM_MODEL, prompt_version, prompt)
+        cached = cache.get(key)
+        if cached is not None:
+            count("llm_cache_hits")
+            if on_line:
+                for line in cached.split("\n"):
+                    on_line(line)
+            return cached
+        count("llm_cache_misses")
+    with timed("llm_call"):
+        if on_line and hasattr(llm, "stream"):
+            text = stream_lines(llm, prompt, on_line, **invoke_kwargs)
+        else:
+            text = llm.invoke(prompt, **invoke_kwargs).content
+    count("llm_calls")
+    observe("llm_response_chars", len(text))
+    observe("llm_response_tokens", estimate_tokens(text))
+    if cache:
+        cache.put(key, text)
+    return text
+
+def stream_lines(llm, prompt, on_line, **invoke_kwargs):
+    """Streams a response, calling `on_line` with each complete line, and returns the full text."""
+    start = time.perf_counter()
+    parts = []
+    pending = ""
+    for chunk in llm.stream(prompt, **invoke_kwargs):
+        if not parts:
+            observe("llm_first_chunk_seconds", time.perf_counter() - start)
+        parts.append(chunk.content)
+        *lines, pending = (pending + chunk.content).split("\n")
+        for line in lines:
+            on_line(line)
+    if pending:
+        on_line(pending)
+    return "".join(parts)
+
 # Function to remove zero-width characters
 def remove_zw_chars(text):
     """Removes zero-width joiner and other related characters."""
     return re.sub(r"[\u200B-\u200F\u2060-\u206F\uFEFF]", "", text)
 
-def clean_placeholder_text(content, url=None):
-    """Cleans unwanted placeholder text and special characters from content, preserving contractions."""
-    unwanted_patterns = [
-        r'Lorem ipsum.*?(\.|。)',       # Placeholder text
-        r'Sample content.*?(\.|。)',    # Sample content
-        r'[\u2000-\u206F\uFEFF]',      # Unwanted Unicode whitespace characters
-        r'[^\w\s.,!?\'\-\–/]',          # Non-standard special characters (excluding apostrophe, hyphen and en dash)
-        r'\[.*?\]',                    # Text inside square brackets
-        r'\(.*?\)'                     # Text inside parentheses
-    ]
-
-    url_specific_patterns = {
-        'example.com': [r'Example text.*?(\.|。)', r'Extra placeholder.*?(\.|。)'],
-        'another.com': [r'Special content.*?(\.|。)']
-    }
+def content_hash(*parts):
+    """Returns a stable SHA-256 hex digest of the given text parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def split_suggestions(item):
+    """Splits an LLM output line into its analysis and suggestions parts; reused (analysis, suggestions) pairs pass through."""
+    if not isinstance(item, str):
+        return tuple(item)
+    if "Suggestions:" in item:
+        analysis, suggestions = item.split("Suggestions:", 1)
+        return analysis.strip(), suggestions.strip()
+    return item.strip(), ""
+
+def run_concurrently(tasks, max_workers=LLM_MAX_CONCURRENCY, updates=None):
+    """Runs named callables on a bounded thread pool, yielding (name, result) as each one finishes.
+
+    With an `updates` queue, items the tasks put on it are also yielded, as (None, item), as
+    soon as they arrive, so the calling thread can render progress while tasks still run.
+    """
+    # Worker threads need the script run context so report_error calls still reach the page,
+    # and the caller's metrics trace so their timings are attributed to the same run
+    ctx = get_script_run_ctx(suppress_warning=True)
+    trace = current_trace()
+
+    def call(task):
+        if ctx:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        with tracing(trace):
+            return task()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(call, task): name for name, task in tasks.items()}
+        if updates is None:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+            return
+        for future in futures:
+            future.add_done_callback(updates.put)
+        remaining = len(futures)
+        while remaining:
+            item = updates.get()
+            if item in futures:
+                remaining -= 1
+                yield futures[item], item.result()
+            else:
+                yield None, item
 
-    # Apply general patterns
-    for pattern in unwanted_patterns:
-        content = re.sub(pattern, '', content, flags=re.IGNORECASE)
+@process_singleton
+def get_text_cleaner():
+    """Returns the process-wide text cleaner with precompiled general and site-specific rules."""
+    return TextCleaner.from_config(CLEANING_RULES_PATH)
 
-    # Apply URL-specific patterns
-    if url and url in url_specific_patterns:
-        for pattern in url_specific_patterns[url]:
-            content = re.sub(pattern, '', content, flags=re.IGNORECASE)
-    
-    # Replace en dash and em dash with hyphen
-    content = content.replace("–", "-")
-    content = content.replace("—", "-")
+def clean_placeholder_text(content, url=None):
+    """Cleans unwanted placeholder text and special characters from content, preserving contractions."""
+    return get_text_cleaner().clean(content, url)
 
-    # Normalize multiple spaces to single spaces (and remove surrounding whitespace)
-    content = re.sub(r'\s+', ' ', content).strip()
+def resolve_html_parser(backend=HTML_PARSER_BACKEND):
+    """Returns the BeautifulSoup parser name to use for the configured backend."""
+    if backend != "auto":
+        return backend
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
 
-    return content.strip()
+HTML_PARSER = resolve_html_parser()
 
 def scrape_page_content(url):
     """Scrapes the HTML content of a given URL."""
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Raises an exception for bad status codes
-        response.encoding = 'utf-8'
-        soup = BeautifulSoup(response.content, "html.parser")
+        with timed("fetch"):
+            page = get_page_fetcher().fetch(url)
+        count("fetch_retries", page.retries)
+        count("page_cache_hits" if page.not_modified else "page_cache_misses")
+        observe("page_bytes", page.size)
+        if page.truncated:
+            count("pages_truncated")
+        with timed("parse"):
+            soup = BeautifulSoup(page.text, HTML_PARSER)  # Already decoded with the detected encoding
         return soup
     except requests.exceptions.RequestException as e:
-        st.error(f"Error accessing URL: {e}")
+        report_error(f"Error accessing URL: {e}")
         log_error("Error in scrape_page_content", e)
         return None
 
+def is_excluded_region(tag):
+    """Returns True for sidebars and footers, which are left out of the extracted content."""
+    if tag.name in ("aside", "footer"):
+        return True
+    return tag.name == "div" and "sidebar" in (tag.get("id") or "")
+
+def landmark_region(tag):
+    """Returns the page region a tag starts (breadcrumb, navigation, header, footer or sidebar), if any."""
+    markers = " ".join([
+        *(tag.get("class") or []), tag.get("id") or "", tag.get("aria-label") or "", tag.get("itemtype") or ""
+    ]).lower()
+    if "breadcrumb" in markers:
+        return "breadcrumb"
+    if tag.name == "nav":
+        return "navigation"
+    if tag.name in ("header", "footer"):
+        return tag.name
+    if is_excluded_region(tag):
+        return "sidebar"
+    return None
+
+def extract_page_elements(soup):
+    """Extracts title, meta description, content blocks, links and page text in a single tree walk.
+
+    Sidebars and footers are left out of the content and page text without modifying the
+    soup. Content blocks are (tag name, text) pairs for headings, paragraphs and list items
+    in document order. Links are collected from the whole page, tagged with the region
+    (body, navigation, header, footer, sidebar or breadcrumb) they appear in.
+    """
+    title = None
+    description_tag = None
+    og_description_tag = None
+    blocks = []
+    links = []
+    breadcrumbs = []
+    text_parts = []
+
+    # Each stack entry: (children iterator, region, inside an excluded sidebar/footer)
+    stack = [(iter(soup.contents), "body", False)]
+    while stack:
+        children, region, excluded = stack[-1]
+        node = next(children, None)
+        if node is None:
+            stack.pop()
+            continue
+        if not isinstance(node, Tag):
+            # Same strings soup.get_text() keeps: no comments, scripts or stylesheets
+            if not excluded and type(node) in (NavigableString, CData):
+                text = node.strip()
+                if text:
+                    text_parts.append(text)
+            continue
+
+        name = node.name
+        node_region = landmark_region(node)
+        if node_region == "breadcrumb" and region != "breadcrumb":
+            breadcrumbs.append(node.get_text(" > ", strip=True))
+        child_region = node_region if node_region and region != "breadcrumb" else region
+        child_excluded = excluded or is_excluded_region(node)
+
+        if name == "a" and node.get("href"):
+            links.append({
+                "href": node["href"],
+                "text": node.get_text(" ", strip=True),
+                "rel": [value.lower() for value in node.get("rel") or []],
+                "target": node.get("target"),
+                "region": child_region,
+            })
+        elif name == "script" and node.get("type") == "application/ld+json":
+            if "BreadcrumbList" in (node.string or ""):
+                breadcrumbs.append("BreadcrumbList structured data")
+        if not child_excluded:
+            if name in CONTENT_TAGS:
+                blocks.append((name, node.get_text()))
+            elif name == "title" and title is None:
+                title = node.get_text()
+            elif name == "meta":
+                if description_tag is None and node.get("name") == "description":
+                    description_tag = node
+                elif og_description_tag is None and node.get("property") == "og:description":
+                    og_description_tag = node
+        stack.append((iter(node.contents), child_region, child_excluded))
+
+    meta_tag = description_tag or og_description_tag
+    return {
+        "title": title.strip() if title is not None else "No title found",
+        "meta_description": (meta_tag.get("content") or "").strip() if meta_tag else "No meta description found",
+        "blocks": blocks,
+        "links": links,
+        "breadcrumbs": breadcrumbs,
+        "text": " ".join(text_parts),
+    }
+
 #Retrieve blog content
 def retrieve_blog_content(url, soup):
-    """Fetches and parses blog content from a given URL, including headings and list items, while filtering out footers and sidebars."""
+    """Extracts blog content from a parsed page, including headings and list items, while filtering out footers and sidebars.
+
+    Returns a page dict with the cleaned content, title, meta description and section tree
+    alongside the raw extraction (content blocks, links and page text), or None if
+    extraction fails.
+    """
     try:
-        # Example selectors, adjust these based on the specific site
-        main_content_selector = 'article'  #Common selector for main article
-        #Remove sidebars using the "aside" or "sidebar" selectors
-        sidebar_selector = 'aside, div[id*="sidebar"]' #Combined selector
-        #Remove footers using the "footer" selector
-        footer_selector = 'footer' #Footer selector
-
-       #Find and remove the sidebars and footers
-        for element in soup.select(sidebar_selector):
-           element.decompose()
-        for element in soup.select(footer_selector):
-           element.decompose()
-
-        # Extract text from <p>, <h1>, <h2>, <h3>, and <li> tags
-        elements = soup.find_all(['p', 'h1', 'h2', 'h3','h4','h5','h6', 'li'])
-        text_content = " ".join([elem.text for elem in elements])
-        content = clean_placeholder_text(text_content, url) #Clean retrieved text
-        #content = remove_placeholder_unicode(content)
-        title = soup.title.string.strip() if soup.title else "No title found"
-        meta_tag = soup.find("meta", {"name": "description"}) or soup.find("meta", {"property": "og:description"})
-        meta_description = meta_tag["content"].strip() if meta_tag else "No meta description found"
+        with timed("extract"):
+            elements = extract_page_elements(soup)
+        with timed("clean"):
+            # Each block is cleaned once; the content and the section texts are both joined from them
+            cleaned = [clean_placeholder_text(text, url) for _, text in elements["blocks"]]
+            content = " ".join(text for text in cleaned if text)
+            sections = build_section_tree(elements["blocks"], cleaned)
 
         if not content.strip():
             raise ValueError("Blog content is empty or could not be retrieved.")
 
-        return content, clean_placeholder_text(title), clean_placeholder_text(meta_description)
+        title = clean_placeholder_text(elements["title"])
+        meta_description = clean_placeholder_text(elements["meta_description"])
+        return {
+            **elements,
+            "content": content,
+            "title": title,
+            "meta_description": meta_description,
+            "sections": sections,
+            "content_hash": content_hash(content, title, meta_description),
+        }
 
-    except requests.exceptions.RequestException as e:
-      st.error(f"Error retrieving blog content: {e}")
-      log_error("RequestException in retrieve_blog_content", e)
-      return None, None, None
     except ValueError as e:
-      st.error(f"Content Error: {e}")
+      report_error(f"Content Error: {e}")
       log_error("ValueError in retrieve_blog_content", e)
-      return None, None, None
+      return None
     except Exception as e:
-      st.error(f"Error in retrieve_blog_content: {e}")
+      report_error(f"Error in retrieve_blog_content: {e}")
       log_error("Error in retrieve_blog_content", e)
-      return None, None, None
+      return None
 
 def print_text_before_llm(text, label="Text Before LLM:"):
-    """Prints the given text with a label. Useful for debugging.
+    """Prints the given text with a label when DEBUG_PROMPTS is enabled. Useful for debugging.
 
     Args:
         text (str): The text to print.
         label (str, optional): A label to identify the printed text. Defaults to "Text Before LLM:".
     """
+    if not DEBUG_PROMPTS:
+        return
     print("=" * 40)
     print(f"{label}")
     print("-" * 40)
@@ -141,17 +498,19 @@ def print_text_before_llm(text, label="Text Before LLM:"):
     print("=" * 40)
 
 #Calculate Readability
-def calculate_readability(content):
-    """Calculates Flesch-Kincaid grade and reading ease for content."""
+def calculate_readability(content, sections=()):
+    """Calculates Flesch-Kincaid grade and reading ease for the content and each section.
+
+    Returns {"grade", "ease", "sections", "hardest"}; the scores are None if the content is
+    empty or scoring fails.
+    """
     try:
         if not content or not content.strip():
-            return None, None
-        kincaid_grade = textstat.flesch_kincaid_grade(content)
-        reading_ease = textstat.flesch_reading_ease(content)
-        return kincaid_grade, reading_ease
+            return {"grade": None, "ease": None, "sections": [], "hardest": []}
+        return get_readability_engine().analyze(content, sections)
     except Exception as e:
         log_error("Error in calculate_readability", e)
-        return None, None
+        return {"grade": None, "ease": None, "sections": [], "hardest": []}
 
 def describe_readability(kincaid_grade, reading_ease):
     """Describes readability and provides suggestions."""
@@ -197,50 +556,31 @@ def describe_readability(kincaid_grade, reading_ease):
     return grade_description, ease_description, grade_suggestion, ease_suggestion
 
 #Extract Keywords
-# def extract_keywords_from_content(content, top_n=20):
-#     """Extracts keywords from blog content using NLP."""
-#     try:
-#         # Print the text before sending to LLM
-#         cleaned_content = clean_placeholder_text(content)
-#         print_text_before_llm(cleaned_content, "Text Before Keyword Extraction LLM:")
-#         doc = nlp(cleaned_content)
-#         keywords = [
-#             chunk.text.lower()
-#             for chunk in doc.noun_chunks
-#             if chunk.text.lower() not in nlp.Defaults.stop_words  # Exclude stopwords
-#         ]
-
-#         # Count keyword frequencies
-#         keyword_counts = Counter(keywords)
-
-#         # Get the top N keywords based on frequency
-#         top_keywords = [keyword for keyword, _ in keyword_counts.most_common(top_n)]
-#         return top_keywords
-#     except Exception as e:
-#         log_error("Error in extract_top_keywords_from_content", e)
-#         return []
+def compute_keyword_stats(page, url):
+    """Computes keyword counts, per-section density and placement locally, or None if spaCy is unavailable."""
+    try:
+        with timed("keywords"):
+            return get_keyword_extractor().analyze(page, url)
+    except Exception as e:
+        log_error("Error in compute_keyword_stats", e)
+        return None
 
 #Optimize Keywords for SEO
-def optimize_seo_keywords(content, page_title, meta_description, url, llm):
+def optimize_seo_keywords(content, page_title, meta_description, url, llm, keyword_stats=None, on_line=None):
     """Optimizes SEO keywords based on structured guidelines."""
+    from langchain.prompts import PromptTemplate  # Deferred: langchain is slow to import
+
     try:
         prompt = PromptTemplate(
-            input_variables=["content", "page_title", "meta_description", "url"],
+            input_variables=["content", "page_title", "meta_description", "url", "keyword_stats"],
             template="""Analyze the following content based on SEO keyword optimization guidelines. Provide a detailed, accurate analysis, evaluation of how well the content adheres to each guideline. In addition, provide suggestions to improve the page in terms of keyword optimization for SEO Performance. If there are no suggestions for improvement, then explicitly state 'No Suggestions'. Do not include any concluding statements or summaries.
 
         Format the analysis and suggestions as follows, with each output on a separate line:
 
         Keyword and Search Intent Alignment:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
-        Primary Keyword in Page Title:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
         Page Title Engagement:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
         Page Title Modifiers:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
-        Page Title Character Length:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
-        Page Title HTML Structure:  [Your analysis here. If you can't assess, state that]. Suggestions: [Specific suggestions here or 'No Suggestions']
-        Primary Keyword in Meta Description:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
-        Primary Keyword in URL:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
-        Primary Keyword in First Sentence:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
-        Keyword Density:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
-        Top 5 Keywords Distribution:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
+        Meta Description Engagement:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
         Variations and LSI Keywords:  [Your analysis here]. Suggestions: [Specific suggestions here or 'No Suggestions']
 
         Content:
@@ -255,18 +595,14 @@ def optimize_seo_keywords(content, page_title, meta_description, url, llm):
         URL:
         {url}
 
+        Keyword Statistics (counted locally over the full page; rely on these figures instead of estimating):
+        {keyword_stats}
+
         SEO Keyword Optimization Guidelines:
-            Evaluate the content's alignment with the target keyword and search intent, ensuring it fits the content and satisfies user expectations.
-            Assess the integration of the primary keyword in the page title and how well it is optimized for search intent.
+            Evaluate the content's alignment with the target keyword and search intent, ensuring it fits the content and satisfies user expectations, and how well the page title is optimized for that intent.
             Analyze the effectiveness of the page title in engaging users and its likelihood of attracting clicks in search results.
             Assess whether the page title could benefit from the inclusion of a temporal modifier, such as a year (e.g., '2025'), considering its current click-worthiness and character length.
-            Confirm whether the page title utilizes the maximum character length without exceeding it while remaining clear and informative.
-            Verify that the page title is wrapped in an H1 tag and follows correct HTML structure.
-            Evaluate the inclusion and usage of the primary keyword in the meta description and its effectiveness in compelling users.
-            Determine if the primary keyword is present in the URL, and assess whether the URL structure is lean and optimized for SEO.
-            Analyze the placement of the primary keyword in the content, especially in the first sentence.
-            Assess the keyword density, ensuring it is balanced and consistent with competitor content.
-            Ensure that top 5 keywords are distributed across various article sections.
+            Evaluate how effectively the meta description compels users to click.
             Evaluate the use of variations of the primary keyword and synonyms (LSI keywords) throughout the content for effective optimization.
             
         The evaluation should deliver a professional, high-quality response that adheres to these standards.
@@ -280,15 +616,16 @@ def optimize_seo_keywords(content, page_title, meta_description, url, llm):
         # Print the cleaned text before sending to LLM
         print_text_before_llm(f"Content: {cleaned_content}, Page Title: {cleaned_page_title}, Meta Description: {cleaned_meta_description}, URL: {cleaned_url}", "Text Before SEO Optimization LLM:")
 
-        response = llm.invoke(prompt.format(
+        response_text = invoke_llm(llm, prompt.format(
             content=cleaned_content,
             page_title=cleaned_page_title,
             meta_description=cleaned_meta_description,
             url=cleaned_url,
-        ))
+            keyword_stats=summarize_keyword_stats(keyword_stats),
+        ), PROMPT_VERSIONS["keyword_optimization"], on_line)
         # Process and return the detailed evaluation as a list
         processed_response = []
-        for line in response.content.strip().split("\n"):
+        for line in response_text.strip().split("\n"):
           parts = line.split("Suggestions:")
           if len(parts) == 2:
             analysis, suggestions = parts
@@ -300,13 +637,15 @@ def optimize_seo_keywords(content, page_title, meta_description, url, llm):
              processed_response.append(line)
         return [remove_zw_chars(line) for line in processed_response]
     except Exception as e:
-        st.error(f"Error optimizing SEO keywords: {e}")
+        report_error(describe_llm_error("Error optimizing SEO keywords", e))
         log_error("Error in optimize_seo_keywords", e)
         return []
 
 #Evaluate Content quality of content
-def evaluate_content_quality(content, llm):
+def evaluate_content_quality(content, llm, on_line=None):
     """Evaluates content quality based on structured guidelines using an LLM, and also provides suggestions."""
+    from langchain.prompts import PromptTemplate
+
     try:
         prompt = PromptTemplate(
             input_variables=["content"],
@@ -318,11 +657,8 @@ def evaluate_content_quality(content, llm):
     Scannability:  [Your analysis here, describe how headings, bullet points, and other elements are used to make the content easy to scan. Provide examples of where elements make it easy to scan the text]. Suggestions: [Specific suggestions for SEO performance and user engagement here or 'No Suggestions']
     Readability:  [Your analysis here, highlight specific sentences or sections that are overly complex and assess if the content meets an 8th-grade readability level]. Suggestions: [Specific suggestions for SEO performance and user engagement here or 'No Suggestions']
     Engagement:  [Your analysis here, assess how the content effectively captures and maintains the reader's attention, and make note of any specific engaging or disengaging elements]. Suggestions: [Specific suggestions for SEO performance and user engagement here or 'No Suggestions']
-    Paragraph Structure:  [Your analysis here, check if paragraphs are short, concise and structured appropriately. Highlight if any sections use dense blocks of text]. Suggestions: [Specific suggestions for SEO performance and user engagement here or 'No Suggestions']
-    Heading Structure:  [Your analysis here, provide an analysis of the heading structure and if it helps the reader navigate the content and its logical flow]. Suggestions: [Specific suggestions for SEO performance and user engagement here or 'No Suggestions']
     Heading Clarity:  [Your analysis here, assess if headings are descriptive, clear and accurately reflect the topic of each section, provide details]. Suggestions: [Specific suggestions for SEO performance and user engagement here or 'No Suggestions']
     Keyword Usage:  [Your analysis here, assess the use of keyword variations, LSI keywords, or synonyms in the headings and throughout the content and note the relevance and frequency of their usage]. Suggestions: [Specific suggestions for SEO performance and user engagement here or 'No Suggestions']
-    Use of Lists: [Your analysis here, confirm if bullet points and numbered lists are used effectively and enhance clarity and structure]. Suggestions: [Specific suggestions for SEO performance and user engagement here or 'No Suggestions']
     Originality and Relevance: [Your analysis here, validate the originality and relevance of the content. State if it aligns with current trends and provides up-to-date information. Also comment if the content appears to be well-researched and informative]. Suggestions: [Specific suggestions for SEO performance and user engagement here or 'No Suggestions']
 
 
@@ -334,11 +670,8 @@ def evaluate_content_quality(content, llm):
         Assess the content's readability and formatting. Confirm if headings, bullet points, or other elements make the content easy to scan and consume.
         Ensure the content is written at an 8th-grade readability level. Highlight any sentences or sections that are overly complex.
         Evaluate whether the content effectively captures and maintains the reader's attention throughout. Indicate any sections that might lack engagement.
-        Verify that paragraphs are short and structured to avoid dense blocks of text. Mention if any sections deviate from this guideline.
-        Analyze the logical flow of the headings. Confirm whether they guide the reader effectively through the content.
         Check if the headings are descriptive and accurately reflect the topic of each section.
         Evaluate the use of keyword variations, LSI keywords, or synonyms in the headings and throughout the content. Note the relevance and frequency of their usage.
-        Verify the use of bullet points and numbered lists where applicable. Confirm whether they enhance clarity and structure.
         Validate the originality and relevance of the content. State whether it aligns with current trends and provides up-to-date information.
 
     The evaluation should deliver a professional, high-quality response that adheres to these standards.
@@ -349,10 +682,10 @@ def evaluate_content_quality(content, llm):
         cleaned_content = clean_placeholder_text(content)
         print_text_before_llm(cleaned_content, "Text Before Content Quality LLM:")
 
-        response = llm.invoke(prompt.format(content = cleaned_content))
+        response_text = invoke_llm(llm, prompt.format(content = cleaned_content), PROMPT_VERSIONS["content_quality"], on_line)
        # Process and return the detailed evaluation as a list
         processed_response = []
-        for line in response.content.strip().split("\n"):
+        for line in response_text.strip().split("\n"):
            parts = line.split("Suggestions:")
            if len(parts) == 2:
                analysis, suggestions = parts
@@ -364,38 +697,44 @@ def evaluate_content_quality(content, llm):
                processed_response.append(line)
         return [remove_zw_chars(line) for line in processed_response]
     except Exception as e:
-        st.error(f"Error evaluating content quality: {e}")
+        report_error(describe_llm_error("Error evaluating content quality", e))
         log_error("Error in evaluate_content_quality", e)
         return []
 
-prompt_template = PromptTemplate.from_template("""
-Analyze the following page content and evaluate its link structure according to the guidelines provided. Provide a detailed,accurate analysis, fact-based evaluation of how well the content adheres to each guideline, focusing on concrete HTML elements and patterns rather than inferences. Include examples of the detected elements from the page content where possible. In addition, provide specific, actionable suggestions to improve the link structure *specifically for SEO performance*. If there are no specific, actionable suggestions for SEO improvement based on the available information, then explicitly state 'No Suggestions'. Do not include any concluding statements.
+LINK_PROMPT_TEMPLATE = """
+Analyze the following link data, which was extracted deterministically from the page's HTML, and evaluate the page's link structure according to the guidelines provided. Provide a detailed, accurate, fact-based evaluation of how well the page adheres to each guideline, relying only on the counts, attributes and examples in the link data rather than inferences. Quote examples from the link data where possible. In addition, provide specific, actionable suggestions to improve the link structure *specifically for SEO performance*. If there are no specific, actionable suggestions for SEO improvement based on the available information, then explicitly state 'No Suggestions'. Do not include any concluding statements.
 
 Format the analysis and suggestions as follows, with each output on a separate line:
 
-Internal Links:  Based on the provided page content, identify if internal links (links to other pages on the same website) are present and provide details on where they are located and the types of links they appear to be (e.g. links in the body, navigation or footer). If found, state where the internal links are located and what type of links they are, otherwise state 'No Internal Links Found'.  Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
-Descriptive Anchor Text:  Based on the provided page content, analyze if the internal links use descriptive anchor text (text that clearly indicates the target page's content) and provide examples. State if descriptive anchor text is used and provide examples, based on what can be determined from the content. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
-Internal Link Optimization: Analyze the page content. Based on what can be determined from the content, are important internal links (e.g. higher value or more relevant pages) placed higher or earlier in the page or are they not prioritized? Identify which links appear to be more important based on their placement. State if important links are prioritized, or if they are not and provide details.  Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
-Breadcrumbs: Analyze the page and ensure Breadcrumbs are present or not, at least including "Home" and "Blog". The exact structure would need confirmation by inspecting the HTML. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
-Usefulness of Internal Links: Based on the page content, assess if internal links are useful for the user (e.g., do they link to related content that helps the user). Provide details of what kind of links they are linking to, and state if they are useful or not, based on what can be determined from the content. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
-Preferred URLs for Internal Links: Based on the page content, analyze the URLs of the internal links. Are they using the preferred or canonical versions (e.g., ensuring all links to the same page are using the same URL format)? Provide examples, stating if this can be determined or if not. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
-External Links: Based on the page content, determine if the page includes external links (links to other websites) to relevant sources, partners, or content, and state if this is highly likely or not. Provide details and why this determination has been made based on what is present in the content. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
-Affiliate and Sponsored Links: Based on the page content, determine if there are affiliate, sponsored, or paid external links on the page. Based on the context, determine how likely it is that these exist. State if it can be inferred or not. If it can be inferred that these exist, make an inference if they are *likely* to be 'nofollow'. State if this is an inference from the provided content, or if it cannot be determined. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
-External Links Opening in New Window: Based on the page content, and using best practices, are external links *likely* set to open in a new window? State if this is an inference from the provided content, or if it cannot be determined. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
-Broken Links: Based on the page content, can it be *reasonably* inferred that there might be any broken links (either internal or external) on the page? Provide your analysis and explain why, and if this is not something that is possible to ascertain from the content, say that. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
-
-Page Content:
+Internal Links:  State how many internal links (links to other pages on the same website) were found and in which regions of the page (body, navigation, header, footer, sidebar, breadcrumb), or state 'No Internal Links Found'.  Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
+Descriptive Anchor Text:  Using the internal link examples and the generic/empty anchor counts, state whether internal links use descriptive anchor text (text that clearly indicates the target page's content) and give examples. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
+Internal Link Optimization: Using the page order of the body internal links, state whether important internal links (e.g. higher value or more relevant pages) are placed higher or earlier in the content, and identify them.  Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
+Breadcrumbs: State whether breadcrumbs were found and whether they include at least "Home" and "Blog". Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
+Usefulness of Internal Links: Based on the anchor text and target URLs, assess whether the internal links point to related content that helps the user. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
+Preferred URLs for Internal Links: Using the internal URL variants, state whether links to the same page consistently use one preferred (canonical) URL format, with examples of any inconsistencies. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
+External Links: State how many external links (links to other websites) were found, where they are, and whether the examples point to relevant sources, partners or content. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
+Affiliate and Sponsored Links: Using the external link examples and rel attribute counts, state whether affiliate, sponsored or paid links appear to be present and whether they are marked nofollow or sponsored. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
+External Links Opening in New Window: State how many external links open in a new window (target=_blank) and whether they are missing rel=noopener. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
+Broken Links: Using the link status check, state how many links were checked and list any broken links with their status. If no check was performed, say so. Suggestions: [Specific suggestions for SEO performance here or 'No Suggestions']
+
+Link Data:
 {content}
-""")
+"""
+
+def analyze_url(link_summary, llm, on_line=None):
+    """Sends the extracted link summary to the LLM and returns the analysis."""
+    from langchain.prompts import PromptTemplate
+
+    prompt = PromptTemplate.from_template(LINK_PROMPT_TEMPLATE).format(content=remove_zw_chars(link_summary))
+    try:
+        response_text = invoke_llm(llm, prompt, PROMPT_VERSIONS["link_evaluation"], on_line)
+    except Exception as e:
+        report_error(describe_llm_error("Error evaluating links", e))
+        log_error("Error in analyze_url", e)
+        return []
 
-def analyze_url(soup, llm):
-    """Sends a prompt to the LLM and returns the analysis."""
-    text_content = soup.get_text(separator=" ", strip=True)
-    prompt = prompt_template.format(content=clean_placeholder_text(text_content))
-    response = llm.invoke(prompt)
-    
     processed_response = []
-    for line in response.content.strip().split("\n"):
+    for line in response_text.strip().split("\n"):
         if ": " in line: # Check for both colon and space
             parts = line.split(": ", 1)  # Split at the first occurrence of ": "
             if len(parts) == 2:
@@ -414,6 +753,242 @@ def analyze_url(soup, llm):
 
     return [remove_zw_chars(line) for line in processed_response]
 
+def get_link_report(page, blog_url, result, checker=None):
+    """Returns the deterministic link report for the page, building and storing it in the result once.
+
+    Link statuses are checked with `checker`, by default the shared link checker if LINK_CHECK is on.
+    """
+    if result["link_report"] is None:
+        if checker is None and LINK_CHECK:
+            checker = get_link_checker()
+        with timed("link_check"):
+            result["link_report"] = build_link_report(
+                page["links"], page["breadcrumbs"], blog_url, checker, LINK_CHECK_MAX
+            )
+    return result["link_report"]
+
+def evaluate_links(page, blog_url, result, llm, on_line=None, previous=None, checker=None):
+    """Builds the deterministic link report, stores it in the result and has the LLM evaluate its summary.
+
+    The report's summary (including link statuses) is the prompt's only input, so the
+    `previous` result's findings are returned instead when the summary is unchanged.
+    """
+    summary = get_link_report(page, blog_url, result, checker)["summary"]
+    result["input_hashes"]["link_evaluation"] = content_hash(PROMPT_VERSIONS["link_evaluation"], summary)
+    reused = reusable_section(previous, "link_evaluation", result["input_hashes"]["link_evaluation"])
+    if reused:
+        return reused
+    return analyze_url(summary, llm, on_line)
+
+def analyze_combined(page, blog_url, result, llm, checker=None):
+    """Runs every analysis section in one structured JSON call.
+
+    Returns {section key: [(analysis, suggestions), ...]} for the sections the response
+    covered, or {} when the content exceeds the token budget or the call or validation fails,
+    so the caller can fall back to the per-section prompts.
+    """
+    content = clean_placeholder_text(page["content"], blog_url)
+    if estimate_tokens(content) > LLM_TOKEN_BUDGET:
+        content = compact_text(content)
+        if estimate_tokens(content) > LLM_TOKEN_BUDGET:
+            count("combined_fallbacks")
+            return {}  # Only the per-section prompts can chunk long content
+    prompt = build_combined_prompt(
+        content,
+        clean_placeholder_text(page["title"]),
+        clean_placeholder_text(page["meta_description"]),
+        blog_url,
+        summarize_keyword_stats(result["keyword_stats"]),
+        remove_zw_chars(get_link_report(page, blog_url, result, checker)["summary"]),
+    )
+    print_text_before_llm(prompt, "Text Before Combined Analysis LLM:")
+    try:
+        response_text = invoke_llm(
+            llm, prompt, PROMPT_VERSIONS["combined"],
+            response_mime_type="application/json", response_schema=response_schema(),
+        )
+        sections = parse_structured_response(remove_zw_chars(response_text)).sections()
+    except Exception as e:
+        log_error("Error in analyze_combined", e)
+        sections = {}
+    if len(sections) < len(ANALYSIS_SECTIONS):
+        count("combined_fallbacks")
+    return sections
+
+def analyze_within_budget(analyze, content, max_tokens=LLM_TOKEN_BUDGET, on_line=None):
+    """Runs `analyze(content, on_line=...)` while keeping each prompt's content within the token budget.
+
+    Content over the budget is compacted first; if it still does not fit, it is split into
+    chunks that are analyzed concurrently and merged into one result line per guideline.
+    Merged output only exists once every chunk is done, so chunked content is not streamed.
+    """
+    if estimate_tokens(content) <= max_tokens:
+        return analyze(content, on_line=on_line)
+    content = compact_text(content)
+    if estimate_tokens(content) <= max_tokens:
+        return analyze(content, on_line=on_line)
+    chunks = chunk_text(content, max_tokens)
+    results = dict(run_concurrently({index: partial(analyze, chunk) for index, chunk in enumerate(chunks)}))
+    return merge_guideline_lines([results[index] for index in range(len(chunks))])
+
+def evaluate_content_by_section(page, llm, result, previous=None, on_line=None):
+    """Evaluates content quality per group of whole top-level sections and merges the findings per guideline.
+
+    Groups whose sections are unchanged since the `previous` result reuse its findings, so
+    after an edit only the groups holding the changed sections are sent to the LLM.
+    """
+    analyze = lambda text, on_line=None: evaluate_content_quality(text, llm, on_line)
+    groups = group_sections(page["sections"], LLM_SECTION_GROUP_TOKENS)
+    if not groups:
+        return analyze_within_budget(analyze, page["content"], on_line=on_line)
+
+    reusable = (previous or {}).get("section_findings", {})
+    keys = [content_hash(PROMPT_VERSIONS["content_quality"], *(section["hash"] for section in group)) for group in groups]
+    tasks = {}
+    for key, group in zip(keys, groups):
+        if reusable.get(key):
+            result["section_findings"][key] = reusable[key]
+            count("section_groups_reused")
+        else:
+            text = " ".join(section_text(section) for section in group)
+            # Only a single group's response is final as it streams; several are merged afterwards
+            tasks[key] = partial(analyze_within_budget, analyze, text, on_line=on_line if len(groups) == 1 else None)
+    count("section_groups_analyzed", len(tasks))
+    for key, lines in run_concurrently(tasks):
+        if lines:
+            result["section_findings"][key] = lines
+
+    if len(keys) == 1:
+        return result["section_findings"].get(keys[0], [])
+    return merge_guideline_lines([result["section_findings"].get(key, []) for key in keys])
+
+def keyword_input_hash(page, blog_url, result):
+    """Hashes the inputs of the keyword optimization prompt, which is only re-run when they change."""
+    return content_hash(
+        PROMPT_VERSIONS["keyword_optimization"], page["content"], page["title"], page["meta_description"],
+        blog_url, summarize_keyword_stats(result["keyword_stats"]),
+    )
+
+def reusable_section(previous, key, input_hash):
+    """Returns the `previous` result's findings for a section if its inputs hashed the same, otherwise None."""
+    lines = (previous or {}).get("sections", {}).get(key)
+    if lines and (previous.get("input_hashes") or {}).get(key) == input_hash:
+        count("sections_reused")
+        return lines
+    return None
+
+#Run the full analysis once
+def run_analysis(page, blog_url, llm, on_update=None, previous=None, link_checker=None):
+    """Runs readability and all LLM analyses for a page and returns a single result object.
+
+    The result holds everything both the analysis and suggestions views need, so switching
+    views never re-scrapes the page or re-sends prompts to the LLM. The three LLM analyses
+    run concurrently, each kept within the prompt token budget; `on_update` is called with
+    the partial result as each one arrives, and with LLM_STREAMING also as each guideline
+    line streams in (sections still streaming are listed under "in_progress"). With
+    ANALYSIS_MODE=combined a single structured call is tried first, and only sections it did
+    not cover use their own prompts.
+
+    Guidelines that can be measured from the HTML (title length, H1, keyword placement and
+    density, heading, paragraph and list structure) are computed locally into "onpage"
+    before any LLM call; the LLM sections only cover the subjective guidelines.
+
+    Given the `previous` result for the same URL, page-level analyses whose inputs are
+    unchanged are reused as they are, and content quality is only re-evaluated for the
+    section groups that changed. Link statuses are checked with `link_checker`, if given,
+    instead of the shared link checker.
+    """
+    content, title, meta_description = page["content"], page["title"], page["meta_description"]
+    with timed("readability"):
+        readability = calculate_readability(content, page["sections"])
+    keyword_stats = compute_keyword_stats(page, blog_url)
+    with timed("onpage"):
+        onpage_metrics = compute_onpage_metrics(page, keyword_stats)
+    result = {
+        "url": blog_url,
+        "content_hash": page["content_hash"],
+        "content": content,
+        "title": title,
+        "meta_description": meta_description,
+        "readability": readability,
+        "keyword_stats": keyword_stats,
+        "onpage_metrics": onpage_metrics,
+        "onpage": onpage_findings(onpage_metrics),
+        "sections": {},
+        "link_report": None,
+        "page_sections": [
+            {key: section[key] for key in ("heading", "level", "path", "hash")} for section in page["sections"]
+        ],
+        "section_findings": {},
+        "input_hashes": {},
+    }
+    # Link findings are reused from within the link task, once the links have been checked
+    result["input_hashes"]["keyword_optimization"] = keyword_input_hash(page, blog_url, result)
+    reused = reusable_section(previous, "keyword_optimization", result["input_hashes"]["keyword_optimization"])
+    if reused:
+        result["sections"]["keyword_optimization"] = reused
+    if on_update:
+        on_update(result)
+
+    if ANALYSIS_MODE == "combined" and not result["sections"]:
+        with timed("analysis_combined"):
+            result["sections"].update(analyze_combined(page, blog_url, result, llm, link_checker))
+        if on_update and result["sections"]:
+            on_update(result)
+
+    # Worker threads put streamed lines on a queue so that only this thread renders them
+    updates = queue.Queue() if on_update and LLM_STREAMING else None
+    streamed = {}
+
+    def stream_to(key):
+        return (lambda line: updates.put((key, line))) if updates else None
+
+    def view():
+        return {**result, "sections": {**streamed, **result["sections"]}, "in_progress": list(streamed)}
+
+    tasks = {
+        "keyword_optimization": lambda: analyze_within_budget(
+            lambda text, on_line=None: optimize_seo_keywords(
+                text, title, meta_description, blog_url, llm, keyword_stats, on_line
+            ),
+            content,
+            on_line=stream_to("keyword_optimization"),
+        ),
+        "content_quality": lambda: evaluate_content_by_section(
+            page, llm, result, previous, on_line=stream_to("content_quality")
+        ),
+        "link_evaluation": lambda: evaluate_links(
+            page, blog_url, result, llm, stream_to("link_evaluation"), previous, link_checker
+        ),
+    }
+    def timed_task(key, task):
+        with timed(f"analysis_{key}"):
+            return task()
+
+    # Sections the combined call already covered are not requested again
+    tasks = {key: partial(timed_task, key, task) for key, task in tasks.items() if key not in result["sections"]}
+    for key, lines in run_concurrently(tasks, updates=updates):
+        if key is None:
+            # A streamed line: show guideline lines provisionally until the section completes
+            section, line = lines
+            line = remove_zw_chars(line).strip()
+            if ":" not in line:
+                continue
+            streamed.setdefault(section, []).append(split_suggestions(line))
+        else:
+            result["sections"][key] = [split_suggestions(item) for item in lines]
+            streamed.pop(key, None)
+        if on_update:
+            on_update(view())
+
+    # Keep sections in display order regardless of completion order
+    result["sections"] = {key: result["sections"][key] for key, _, _ in ANALYSIS_SECTIONS}
+    if "link_evaluation" not in result["input_hashes"]:  # Covered by the combined call
+        result["input_hashes"]["link_evaluation"] = content_hash(
+            PROMPT_VERSIONS["link_evaluation"], get_link_report(page, blog_url, result, link_checker)["summary"]
+        )
+    return result
+
 # Streamlit App
 
 def main():
@@ -446,6 +1021,10 @@ def main():
         st.session_state.analysis_done = False
     if "show_suggestions" not in st.session_state:
         st.session_state.show_suggestions = False
+    if "analysis_cache" not in st.session_state:
+        st.session_state.analysis_cache = {}  # (url, content hash) -> analysis result
+    if "analysis_key" not in st.session_state:
+        st.session_state.analysis_key = None
 
     # Layout with columns for better alignment
     col1, col2, col3 = st.columns([4, 1, 1])
@@ -465,32 +1044,41 @@ def main():
             st.session_state.blog_url = ""
             st.session_state.analysis_done = False
             st.session_state.show_suggestions = False
+            st.session_state.analysis_key = None
             st.rerun()  # Refresh UI
 
     with col3:
         analyze_btn = st.button("🚀 Analyze")
 
+    # Debug panel with per-stage timings, sizes and cache counters
+    start_metrics_endpoint()
+    show_debug = st.sidebar.checkbox("🛠 Show debug metrics")
+
     # If analysis button is clicked
     if analyze_btn:
-        with st.spinner("🔍 Analyzing Blog... Please wait..."):
-            soup = scrape_page_content(blog_url)
-            if not soup:
-                st.error("❌ Failed to retrieve page content")
-                return
-            
-            content, title, meta_description = retrieve_blog_content(blog_url, soup)
-            if not content:
-                st.error("❌ Failed to extract content from the blog")
-                return
-
-            show_analysis(content, title, meta_description, soup, blog_url)
+        with st.spinner("🔍 Analyzing Blog... Please wait..."), tracing(PipelineMetrics()) as trace:
+            with timed("pipeline_total"):
+                key = analyze_blog(blog_url)
+        st.session_state.last_trace = trace.snapshot()
+        export_metrics()
+        if show_debug:
+            show_debug_metrics()
+        if not key:
+            return
+
+        # Store analysis state
+        st.session_state.analysis_key = key
+        st.session_state.analysis_done = True
+        st.session_state.show_suggestions = False
+    elif show_debug:
+        show_debug_metrics()
 
-            # Store analysis state
-            st.session_state.analysis_done = True
-            st.session_state.show_suggestions = False
+    result = st.session_state.analysis_cache.get(st.session_state.analysis_key)
 
-    # Show "Analysis Complete!" message if analysis is done
+    # Show the analysis and "Analysis Complete!" message if analysis is done
     if st.session_state.analysis_done and not st.session_state.show_suggestions:
+        if result:
+            show_analysis(result, show_history=True)
         st.success("✅ Analysis Complete!")  # Confirmation message
         
         if st.button("💡 Show SEO Suggestions"):
@@ -503,20 +1091,177 @@ def main():
             st.session_state.show_suggestions = False
             st.rerun()
 
-        with st.spinner("✨ Generating suggestions..."):
-            soup = scrape_page_content(blog_url)
-            content, title, meta_description = retrieve_blog_content(blog_url, soup)
-            if content:
-                show_suggestions(content, title, meta_description, soup, blog_url)
+        if result:
+            show_suggestions(result)
+
+def analyze_blog(blog_url):
+    """Scrapes and analyzes a blog URL, storing the result in session state. Returns its cache key or None."""
+    if ANALYSIS_SERVICE_URL:
+        return analyze_blog_remotely(blog_url)
+    start = time.perf_counter()
+    soup = scrape_page_content(blog_url)
+    if not soup:
+        st.error("❌ Failed to retrieve page content")
+        return None
+    
+    page = retrieve_blog_content(blog_url, soup)
+    if not page:
+        st.error("❌ Failed to extract content from the blog")
+        return None
+
+    # Reuse the stored result if this exact page version was already analyzed; a result
+    # with failed LLM sections is analyzed again, reusing the sections that succeeded
+    cache = st.session_state.analysis_cache
+    key = (blog_url, page["content_hash"])
+    cached = cache.get(key)
+    if cached is None or not all(cached["sections"].values()):
+        # Render each section as soon as its result arrives
+        live_view = st.empty()
+
+        def render_partial(partial_result):
+            with live_view.container():
+                show_analysis(partial_result)
+
+        # The latest result for this URL lets unchanged sections and page-level findings be reused
+        previous = cached or next((cache[other] for other in reversed(list(cache)) if other[0] == blog_url), None)
+        cache.pop(key, None)  # Re-inserted as the newest entry
+        cache[key] = run_analysis(page, blog_url, get_llm_client(), on_update=render_partial, previous=previous)
+        live_view.empty()
+        record_run(cache[key], time.perf_counter() - start)
+        while len(cache) > MAX_CACHED_ANALYSES:
+            cache.pop(next(iter(cache)))
+    return key
+
+def service_request(method, path, **kwargs):
+    """Calls the analysis service API and returns the decoded JSON response."""
+    response = requests.request(method, f"{ANALYSIS_SERVICE_URL}{path}", **kwargs)
+    if response.status_code >= 400:
+        raise requests.exceptions.HTTPError(
+            f"{response.status_code}: {response.json().get('error', response.reason)}", response=response
+        )
+    return response.json()
+
+def analyze_blog_remotely(blog_url):
+    """Submits a blog URL to the analysis service and shows its progress until the result is ready.
 
-def show_analysis(content, title, meta_description, soup, blog_url):
+    Stores the result in session state and returns its cache key, or None if the analysis failed.
+    """
+    live_view = st.empty()
+    try:
+        job = service_request("post", "/jobs", json={"url": blog_url}, timeout=10)
+        while job["status"] not in ("done", "failed"):
+            job = service_request(
+                "get", f"/jobs/{job['id']}", params={"wait": ANALYSIS_SERVICE_WAIT, "version": job["version"]},
+                timeout=ANALYSIS_SERVICE_WAIT + 10,
+            )
+            if job["partial"]:
+                with live_view.container():
+                    show_analysis(job["partial"])
+        live_view.empty()
+        if job["status"] == "failed":
+            st.error(f"❌ {job['error']}")
+            return None
+        result = service_request("get", f"/jobs/{job['id']}/result", timeout=30)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        live_view.empty()
+        st.error(f"❌ Analysis service error: {e}")
+        log_error("Error in analyze_blog_remotely", e)
+        return None
+
+    cache = st.session_state.analysis_cache
+    key = (blog_url, result["content_hash"])
+    cache[key] = result
+    while len(cache) > MAX_CACHED_ANALYSES:
+        cache.pop(next(iter(cache)))
+    return key
+
+def record_run(result, elapsed_seconds):
+    """Adds an app analysis to the run history, with the timings traced so far."""
+    store = get_results_store()
+    if store is None:
+        return
+    trace = current_trace()
+    store.add({
+        **result,
+        "status": "ok" if all(result["sections"].values()) else "partial",
+        "elapsed_seconds": round(elapsed_seconds, 3),
+        "metrics": trace.snapshot() if trace else None,
+    }, source="app")
+    store.flush()  # So the history shown with this result already includes it; bounded so a stuck writer cannot hang the page
+
+def hardest_sections(readability):
+    """Returns the scored sections that most need simplifying, hardest first."""
+    sections = readability.get("sections", [])
+    return [sections[index] for index in readability.get("hardest", [])]
+
+def section_label(section):
+    return " › ".join([*section["path"], section["heading"]])
+
+def show_hardest_sections(readability):
+    hardest = hardest_sections(readability)
+    if hardest:
+        st.markdown("**Hardest sections**")
+        for section in hardest:
+            st.write(
+                f"- {section_label(section)}: grade {section['grade']}, reading ease {section['ease']} "
+                f"({section['words']} words)"
+            )
+
+def show_readability_history(url):
+    """Lists the readability scores of earlier runs of this URL from the run history."""
+    store = get_results_store()
+    runs = store.history(url, limit=6)[1:] if store else []  # The newest run is the one shown above
+    if runs:
+        st.markdown("**Earlier runs**")
+        st.table([
+            {
+                "analyzed": time.strftime("%Y-%m-%d %H:%M", time.localtime(run["analyzed_at"])),
+                "grade": run["grade"],
+                "ease": run["ease"],
+                "source": run["source"],
+            }
+            for run in runs
+        ])
+
+def metrics_rows(snapshot):
+    """Flattens a metrics snapshot into table rows."""
+    rows = [
+        {"metric": name, "count": summary["count"], "total": round(summary["sum"], 3), "max": round(summary["max"], 3)}
+        for name, summary in sorted(snapshot["observations"].items())
+    ]
+    rows += [{"metric": name, "count": value, "total": None, "max": None} for name, value in sorted(snapshot["counters"].items())]
+    return rows
+
+def show_debug_metrics():
+    with st.sidebar:
+        st.subheader("Pipeline Metrics")
+        trace = st.session_state.get("last_trace")
+        if trace:
+            st.markdown("**Last analysis**")
+            st.table(metrics_rows(trace))
+        st.markdown("**Process totals**")
+        st.table(metrics_rows(METRICS.snapshot()))
+        cache = get_llm_cache()
+        if cache:
+            st.markdown("**LLM cache**")
+            st.json(cache.stats())
+
+def analysis_findings(result, key):
+    """Returns a section's measured on-page findings followed by its LLM findings."""
+    return result.get("onpage", {}).get(key, []) + result["sections"].get(key, [])
+
+def show_analysis(result, show_history=False):
     st.subheader("Analysis")
-    readability_grade, readability_ease = calculate_readability(content)
+    readability_grade = result["readability"]["grade"]
+    readability_ease = result["readability"]["ease"]
     grade_description, ease_description, _, _ = describe_readability(readability_grade, readability_ease)
 
     with st.expander("Readability Scores"):
         st.write(f"**Flesch-Kincaid Grade Level:** {readability_grade} - {grade_description}")
         st.write(f"**Flesch Reading Ease:** {readability_ease} - {ease_description}")
+        show_hardest_sections(result["readability"])
+        if show_history:
+            show_readability_history(result["url"])
 
     # extracted_keywords = extract_keywords_from_content(content)
     # with st.expander("Extracted Keywords"):
@@ -525,58 +1270,44 @@ def show_analysis(content, title, meta_description, soup, blog_url):
     #     else:
     #             st.warning("No keywords found.")
 
-    seo_analysis = optimize_seo_keywords(content, title, meta_description, blog_url, llm)
-    with st.expander("Keyword Optimization Analysis"):
-        for item in seo_analysis:
-            analysis, _ = item.split("Suggestions:") if "Suggestions:" in item else (item, "")
-            st.write(analysis.strip())
-
-    content_quality = evaluate_content_quality(content, llm)
-    with st.expander("Content Evaluation Analysis"):
-        for item in content_quality:
-            analysis, _ = item.split("Suggestions:") if "Suggestions:" in item else (item, "")
-            st.write(analysis.strip())
-
-    link_analysis = analyze_url(soup, llm)
-    with st.expander("Link Evaluation"):
-        for item in link_analysis:
-            analysis, _ = item.split("Suggestions:") if "Suggestions:" in item else (item, "")
-            st.write(analysis.strip())
-
-def show_suggestions(content, title, meta_description, soup, blog_url):
+    in_progress = result.get("in_progress", ())
+    for key, analysis_title, _ in ANALYSIS_SECTIONS:
+        if key not in result["sections"]:
+            continue  # Still being analyzed
+        # Sections still streaming stay open so new guideline lines are visible as they arrive
+        with st.expander(f"{analysis_title} (analyzing…)" if key in in_progress else analysis_title,
+                         expanded=key in in_progress):
+            for analysis, _ in analysis_findings(result, key):
+                st.write(analysis)
+
+def show_suggestions(result):
     st.subheader("Suggestions")
 
-    _, _, grade_suggestion, ease_suggestion = describe_readability(*calculate_readability(content))
-    if grade_suggestion or ease_suggestion:
+    _, _, grade_suggestion, ease_suggestion = describe_readability(
+        result["readability"]["grade"], result["readability"]["ease"]
+    )
+    hardest = hardest_sections(result["readability"])
+    if grade_suggestion or ease_suggestion or hardest:
         with st.expander("Readability Suggestions"):
             if grade_suggestion:
                 st.write(f"- {grade_suggestion}")
             if ease_suggestion:
                 st.write(f"- {ease_suggestion}")
-
-    seo_suggestions = optimize_seo_keywords(content, title, meta_description, blog_url, llm)
-    if any("Suggestions:" in item and "No Suggestions" not in item for item in seo_suggestions):
-        with st.expander("Keyword Optimization Suggestions"):
-            for item in seo_suggestions:
-                _, suggestions = item.split("Suggestions:") if "Suggestions:" in item else ("", "")
-                if suggestions.strip() and suggestions.strip() != "No Suggestions":
-                    st.write(suggestions.strip())
-
-    content_suggestions = evaluate_content_quality(content, llm)
-    if any("Suggestions:" in item and "No Suggestions" not in item for item in content_suggestions):
-        with st.expander("Content Evaluation Suggestions"):
-            for item in content_suggestions:
-                _, suggestions = item.split("Suggestions:") if "Suggestions:" in item else ("", "")
-                if suggestions.strip() and suggestions.strip() != "No Suggestions":
-                    st.write(suggestions.strip())
-
-    link_suggestions = analyze_url(soup, llm)
-    if any("Suggestions:" in item and "No Suggestions" not in item for item in link_suggestions):
-        with st.expander("Link Evaluation Suggestions"):
-            for item in link_suggestions:
-                _, suggestions = item.split("Suggestions:") if "Suggestions:" in item else ("", "")
-                if suggestions.strip() and suggestions.strip() != "No Suggestions":
-                    st.write(suggestions.strip())
+            for section in hardest:
+                st.write(
+                    f"- Simplify \"{section_label(section)}\" (grade {section['grade']}), for example by splitting "
+                    f"its longest sentence: \"{section['longest_sentence']}\""
+                )
+
+    for key, _, suggestions_title in ANALYSIS_SECTIONS:
+        suggestions = [
+            suggestion for _, suggestion in analysis_findings(result, key)
+            if suggestion and suggestion != "No Suggestions"
+        ]
+        if suggestions:
+            with st.expander(suggestions_title):
+                for suggestion in suggestions:
+                    st.write(suggestion)
 
 if __name__ == "__main__":
     main()
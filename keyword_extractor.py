@@ -0,0 +1,213 @@
+import re
+import threading
+from collections import Counter
+
+from prompt_budget import split_sentences
+from section_tree import build_section_tree
+
+SLUG_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def _lemma(token):
+    return (token.lemma_ or token.lower_).lower()
+
+
+def _content_tokens(doc):
+    return [token for token in doc if token.is_alpha and not token.is_stop]
+
+
+def _phrase(span):
+    """Normalizes a noun chunk to its lemmatized content words, e.g. "The best SEO tips" -> "good seo tip"."""
+    return " ".join(_lemma(token) for token in _content_tokens(span))
+
+
+def _doc_counts(doc):
+    """Returns (word count, noun phrase counts, lemma counts) for one processed document."""
+    lemmas = Counter(_lemma(token) for token in _content_tokens(doc))
+    phrases = Counter()
+    if doc.has_annotation("DEP"):
+        phrases.update(phrase for phrase in map(_phrase, doc.noun_chunks) if phrase)
+    return sum(token.is_alpha for token in doc), phrases, lemmas
+
+
+def _contains(lemma_sequence, keyword):
+    """True if the keyword's words appear consecutively in the lemma sequence."""
+    words = keyword.split()
+    return any(lemma_sequence[i:i + len(words)] == words for i in range(len(lemma_sequence) - len(words) + 1))
+
+
+def _in_url(url, keyword):
+    slug = [part for part in SLUG_SEPARATORS.split((url or "").lower()) if part]
+    # Slugs are not lemmatized, so accept any slug word that starts with the keyword's lemma
+    return all(any(part.startswith(word) for part in slug) for word in keyword.split())
+
+
+class KeywordExtractor:
+    """Computes keyword frequencies, per-section density and placement with batched spaCy processing.
+
+    The sections of all pages passed to `analyze_many` go through one batched `nlp.pipe`
+    call, and their titles, meta descriptions and first sentences through a second one
+    that skips the parser. Pages from concurrent `analyze` calls are collected into such
+    batches, so batch and crawl workers share pipe calls instead of queueing one by one.
+    """
+
+    def __init__(self, nlp, batch_size=64, n_process=1, top_n=10):
+        self.nlp = nlp
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.top_n = top_n
+        self._lock = threading.Lock()  # spaCy pipelines are not safe to run from several threads at once
+        self._collector = threading.Condition()
+        self._pending = []  # Requests waiting for the next batch
+        self._running = False
+
+    def _pipe(self, texts, disable=()):
+        disable = [name for name in disable if name in self.nlp.pipe_names]
+        # Worker processes are started per pipe call, which only pays off for more than one batch of texts
+        n_process = self.n_process if len(texts) > self.batch_size else 1
+        return list(self.nlp.pipe(texts, batch_size=self.batch_size, n_process=n_process, disable=disable))
+
+    def analyze(self, page, url):
+        """Returns keyword statistics for one page, batched with pages other threads submit meanwhile.
+
+        Pages queue up while a batch runs; the next caller to find the pipeline idle processes
+        everything queued in one `analyze_many` call, so batches grow with the number of workers.
+        """
+        request = {"page": (page, url), "done": False, "result": None, "error": None}
+        with self._collector:
+            self._pending.append(request)
+            self._collector.wait_for(lambda: request["done"] or not self._running)
+            if request["done"]:
+                return self._outcome(request)
+            self._running = True
+            batch, self._pending = self._pending, []
+
+        outcomes = [(None, RuntimeError("Keyword extraction was interrupted"))] * len(batch)
+        try:
+            outcomes = [(result, None) for result in self.analyze_many([item["page"] for item in batch])]
+        except Exception:
+            # Isolate the failing page rather than failing every page of the batch
+            outcomes = [self._analyze_one(item["page"]) for item in batch]
+        finally:
+            with self._collector:
+                for item, (result, error) in zip(batch, outcomes):
+                    item.update(done=True, result=result, error=error)
+                self._running = False
+                self._collector.notify_all()
+        return self._outcome(request)
+
+    def _analyze_one(self, page):
+        try:
+            return self.analyze_many([page])[0], None
+        except Exception as e:
+            return None, e
+
+    @staticmethod
+    def _outcome(request):
+        if request["error"] is not None:
+            raise request["error"]
+        return request["result"]
+
+    def analyze_many(self, pages):
+        """Returns keyword statistics for each (page, url) pair.
+
+        Pages need a title and meta description, and either a section tree or the extracted blocks.
+        """
+        layouts = []
+        section_texts = []
+        short_texts = []
+        for page, url in pages:
+            sections = page.get("sections") or build_section_tree(page.get("blocks") or [])
+            first_sentence = next(iter(split_sentences(sections[0]["text"])), "") if sections else ""
+            layouts.append((sections, url, len(section_texts), len(short_texts)))
+            section_texts += [section["text"] for section in sections]
+            short_texts += [page.get("title") or "", page.get("meta_description") or "", first_sentence]
+
+        with self._lock:
+            section_docs = self._pipe(section_texts)
+            short_docs = self._pipe(short_texts, disable=("parser",))
+
+        results = []
+        for sections, url, section_start, short_start in layouts:
+            docs = section_docs[section_start:section_start + len(sections)]
+            title, meta_description, first_sentence = (
+                [_lemma(token) for token in doc if token.is_alpha] for doc in short_docs[short_start:short_start + 3]
+            )
+            results.append(self._stats(sections, docs, url, title, meta_description, first_sentence))
+        return results
+
+    def _stats(self, sections, docs, url, title, meta_description, first_sentence):
+        words = 0
+        phrases = Counter()
+        lemmas = Counter()
+        per_section = []
+        for doc in docs:
+            section_words, section_phrases, section_lemmas = _doc_counts(doc)
+            words += section_words
+            phrases += section_phrases
+            lemmas += section_lemmas
+            per_section.append((section_words, section_phrases, section_lemmas))
+
+        # Noun phrases make better keyword candidates; fall back to lemmas without a parser
+        use_phrases = bool(phrases)
+        top = (phrases if use_phrases else lemmas).most_common(self.top_n)
+
+        def density(occurrences, total):
+            return round(100 * occurrences / total, 2) if total else 0.0
+
+        keywords = []
+        for keyword, occurrences in top:
+            section_density = []
+            for section, (section_words, section_phrases, section_lemmas) in zip(sections, per_section):
+                section_count = (section_phrases if use_phrases else section_lemmas)[keyword]
+                section_density.append({
+                    "heading": section["heading"],
+                    "count": section_count,
+                    "density": density(section_count, section_words),
+                })
+            keywords.append({
+                "keyword": keyword,
+                "count": occurrences,
+                "density": density(occurrences, words),
+                "sections_with_keyword": sum(entry["count"] > 0 for entry in section_density),
+                "section_density": section_density,
+                "in_title": _contains(title, keyword),
+                "in_meta_description": _contains(meta_description, keyword),
+                "in_url": _in_url(url, keyword),
+                "in_first_sentence": _contains(first_sentence, keyword),
+            })
+
+        return {
+            "word_count": words,
+            "section_count": len(sections),
+            "keywords": keywords,
+            "top_lemmas": lemmas.most_common(self.top_n),
+        }
+
+
+def summarize_keyword_stats(stats, top=5):
+    """Renders keyword statistics as a compact, line-per-fact summary for the keyword prompt."""
+    if not stats or not stats["keywords"]:
+        return "Keyword statistics: not available"
+
+    def yes_no(value):
+        return "yes" if value else "no"
+
+    keywords = stats["keywords"]
+    primary = keywords[0]
+    lines = [
+        f"Word count: {stats['word_count']} in {stats['section_count']} sections",
+        "Top keywords (count, density): "
+        + ", ".join(f'"{k["keyword"]}" {k["count"]} ({k["density"]}%)' for k in keywords[:top]),
+        "Top lemmas: " + ", ".join(f"{lemma} {occurrences}" for lemma, occurrences in stats["top_lemmas"][:top * 2]),
+        f'Most frequent keyword "{primary["keyword"]}" appears in: title {yes_no(primary["in_title"])}, '
+        f'meta description {yes_no(primary["in_meta_description"])}, URL {yes_no(primary["in_url"])}, '
+        f'first sentence {yes_no(primary["in_first_sentence"])}',
+    ]
+    for keyword in keywords[:top]:
+        densest = max(keyword["section_density"], key=lambda entry: entry["density"], default=None)
+        lines.append(
+            f'"{keyword["keyword"]}" appears in {keyword["sections_with_keyword"]}/{stats["section_count"]} sections'
+            + (f', densest in "{densest["heading"]}" ({densest["density"]}%)' if densest and densest["count"] else "")
+        )
+    return "\n".join(lines)
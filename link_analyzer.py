@@ -0,0 +1,208 @@
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+GENERIC_ANCHORS = {"click here", "here", "read more", "more", "learn more", "this", "link", "continue reading"}
+SKIPPED_SCHEMES = ("mailto:", "tel:", "javascript:", "data:")
+TRANSIENT_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _host(url):
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def canonical_form(url):
+    """Normalizes scheme, www prefix, trailing slash and fragment so URL variants compare equal."""
+    parsed = urlparse(url)
+    path = parsed.path.rstrip("/") or "/"
+    query = f"?{parsed.query}" if parsed.query else ""
+    return f"{_host(url)}{path}{query}"
+
+
+def classify_links(links, page_url):
+    """Resolves extracted anchors against the page URL and marks each as internal or external.
+
+    Fragment-only, mailto:, tel: and javascript: links are dropped.
+    """
+    page_host = _host(page_url)
+    classified = []
+    for position, link in enumerate(links):
+        href = link["href"].strip()
+        if not href or href.startswith("#") or href.lower().startswith(SKIPPED_SCHEMES):
+            continue
+        url = urljoin(page_url, href).split("#", 1)[0]
+        if urlparse(url).scheme not in ("http", "https"):
+            continue
+        classified.append({
+            **link,
+            "url": url,
+            "internal": _host(url) == page_host,
+            "position": position,
+        })
+    return classified
+
+
+class LinkChecker:
+    """Checks link status concurrently with HEAD requests, a per-host connection limit and a result cache.
+
+    The cache keeps up to `cache_size` URLs, least recently used first out. Definitive
+    statuses stay valid for `cache_ttl` seconds; request errors, 429 and 5xx responses only
+    for `failure_ttl`, so a link that failed once is soon checked again. Subclasses can
+    override `before_request` to skip links or delay requests.
+    """
+
+    def __init__(self, session=None, timeout=5, per_host_limit=4, max_workers=16, cache_ttl=24 * 3600,
+                 failure_ttl=300, cache_size=10_000):
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
+        self.max_workers = max_workers
+        self.cache_ttl = cache_ttl
+        self.failure_ttl = failure_ttl
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # URL -> (status, expiry time)
+        self._lock = threading.Lock()
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host_limit))
+
+    def _cached(self, url):
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return None
+            if time.time() >= entry[1]:
+                del self._cache[url]
+                return None
+            self._cache.move_to_end(url)
+            return entry[0]
+
+    def before_request(self, url):
+        """Called before a link is requested; returning False skips it. Allows every link."""
+        return True
+
+    def check(self, url):
+        """Returns the HTTP status code for `url`, an error name if the request failed, or None if it was skipped."""
+        status = self._cached(url)
+        if status is not None:
+            return status
+        if not self.before_request(url):
+            return None
+        with self._lock:
+            slot = self._host_slots[_host(url)]
+        with slot:
+            try:
+                response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+                if response.status_code in (403, 405, 501):
+                    # Some servers reject HEAD; confirm with a GET without downloading the body
+                    response = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True)
+                    response.close()
+                status = response.status_code
+            except requests.exceptions.RequestException as e:
+                status = type(e).__name__
+        transient = not isinstance(status, int) or status in TRANSIENT_STATUSES
+        with self._lock:
+            self._cache[url] = (status, time.time() + (self.failure_ttl if transient else self.cache_ttl))
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return status
+
+    def check_many(self, urls):
+        """Checks unique URLs concurrently and returns a {url: status} mapping, with None for skipped ones."""
+        unique = list(dict.fromkeys(urls))
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique))) as executor:
+            statuses = zip(unique, executor.map(self.check, unique))
+            return dict(statuses)
+
+
+def is_broken(status):
+    return not isinstance(status, int) or status >= 400
+
+
+def build_link_report(links, breadcrumbs, page_url, checker=None, max_checked=100):
+    """Builds structured link statistics and a compact text summary for the link evaluation prompt."""
+    classified = classify_links(links, page_url)
+    internal = [link for link in classified if link["internal"]]
+    external = [link for link in classified if not link["internal"]]
+
+    statuses = {}
+    not_checked = []
+    if checker:
+        urls = list(dict.fromkeys(link["url"] for link in classified))
+        statuses = checker.check_many(urls[:max_checked])
+        # Links over the limit or skipped by the checker are reported as such, not left out
+        not_checked = [url for url in urls if statuses.get(url) is None]
+        statuses = {url: status for url, status in statuses.items() if status is not None}
+    broken = [(url, status) for url, status in statuses.items() if is_broken(status)]
+
+    variants = defaultdict(set)
+    for link in internal:
+        variants[canonical_form(link["url"])].add(link["url"])
+    inconsistent = [sorted(urls) for urls in variants.values() if len(urls) > 1]
+
+    anchor_texts = [link["text"].strip().lower() for link in internal]
+    report = {
+        "internal": len(internal),
+        "external": len(external),
+        "internal_by_region": dict(Counter(link["region"] for link in internal)),
+        "external_by_region": dict(Counter(link["region"] for link in external)),
+        "generic_anchors": sum(text in GENERIC_ANCHORS for text in anchor_texts),
+        "empty_anchors": sum(not text for text in anchor_texts),
+        "nofollow": sum("nofollow" in link["rel"] for link in external),
+        "sponsored": sum("sponsored" in link["rel"] for link in external),
+        "ugc": sum("ugc" in link["rel"] for link in external),
+        "new_window": sum(link["target"] == "_blank" for link in external),
+        "new_window_without_noopener": sum(
+            link["target"] == "_blank" and not {"noopener", "noreferrer"} & set(link["rel"]) for link in external
+        ),
+        "breadcrumbs": breadcrumbs,
+        "non_canonical_variants": inconsistent,
+        "checked": len(statuses),
+        "not_checked": not_checked,
+        "broken": broken,
+    }
+    report["summary"] = summarize_link_report(report, internal, external, page_url)
+    return report
+
+
+def _examples(links, limit):
+    return "; ".join(f'"{link["text"] or "(no text)"}" -> {link["url"]} [{link["region"]}]' for link in links[:limit])
+
+
+def _regions(counts):
+    return ", ".join(f"{region} {count}" for region, count in sorted(counts.items(), key=lambda item: -item[1])) or "none"
+
+
+def summarize_link_report(report, internal, external, page_url, examples=8):
+    """Renders the link statistics as a short, line-per-fact summary."""
+    body_internal = [link for link in internal if link["region"] == "body"]
+    lines = [
+        f"Page URL: {page_url}",
+        f"Breadcrumbs: {' | '.join(report['breadcrumbs']) if report['breadcrumbs'] else 'none found'}",
+        f"Internal links: {report['internal']} (by region: {_regions(report['internal_by_region'])})",
+        f"First body internal links in page order: {_examples(body_internal, examples) or 'none'}",
+        f"Internal anchor text: {report['generic_anchors']} generic (e.g. 'click here', 'read more'), "
+        f"{report['empty_anchors']} empty or image-only",
+        "Internal URL variants pointing to the same page: "
+        + ("; ".join(" vs ".join(urls) for urls in report["non_canonical_variants"][:examples]) or "none"),
+        f"External links: {report['external']} (by region: {_regions(report['external_by_region'])})",
+        f"External link examples: {_examples(external, examples) or 'none'}",
+        f"External rel attributes: {report['nofollow']} nofollow, {report['sponsored']} sponsored, {report['ugc']} ugc",
+        f"External links opening in a new window (target=_blank): {report['new_window']}, "
+        f"of which {report['new_window_without_noopener']} lack rel=noopener/noreferrer",
+    ]
+    if report["checked"] or report["not_checked"]:
+        broken = "; ".join(f"{url} ({status})" for url, status in report["broken"][:examples])
+        line = f"Link status check: {report['checked']} checked, {len(report['broken'])} broken: {broken or 'none'}"
+        if report["not_checked"]:
+            line += f"; {len(report['not_checked'])} not checked, status unknown: {'; '.join(report['not_checked'][:examples])}"
+        lines.append(line)
+    else:
+        lines.append("Link status check: not performed")
+    return "\n".join(lines)
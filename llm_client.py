@@ -0,0 +1,191 @@
+import random
+import threading
+import time
+
+from pipeline_metrics import count, observe
+from prompt_budget import estimate_tokens
+
+# google.api_core exception names, matched by name so this module does not import the Google client
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "Aborted", "BadGateway",
+    "ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout", "TimeoutError",
+}
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the LLM while the circuit breaker is open."""
+
+
+def is_retryable(error):
+    """True for rate limits, timeouts and transient server errors; False for auth, quota-scope and bad requests.
+
+    The exception chain is inspected because langchain wraps the underlying Google API errors.
+    """
+    while error is not None:
+        if type(error).__name__ in RETRYABLE_ERRORS:
+            return True
+        status = getattr(error, "code", None)
+        if isinstance(status, int):
+            return status in RETRYABLE_STATUS
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class TokenBucket:
+    """Blocking token bucket refilled continuously at `rate_per_minute`, holding at most `capacity` tokens."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1.0, float(rate_per_minute))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Blocks until `tokens` are available and takes them; requests above capacity are capped to it."""
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and lets one trial call through after `reset_timeout`."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        """Returns True if a call may proceed; while half-open only one trial call is allowed at a time."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    count("llm_circuit_opened")
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class ResilientLLM:
+    """Shared call layer for the chat model: rate limiting, retries with backoff, fail-fast and a circuit breaker.
+
+    Calls wait for a request token and, when `tokens_per_minute` is set, for their estimated
+    prompt tokens, so bursts from many workers are smoothed to the configured quota. Retryable
+    errors are retried with full-jitter exponential backoff; anything else (401/403, invalid
+    arguments) is raised at once. Repeated transient failures open the circuit breaker, and
+    further calls fail fast with `CircuitOpenError` until a trial call succeeds.
+    """
+
+    def __init__(self, llm, requests_per_minute=60, tokens_per_minute=0, max_concurrency=4,
+                 max_retries=4, base_delay=1.0, max_delay=30.0, breaker=None):
+        self._llm = llm
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _before_call(self, cost):
+        """Fails fast while the circuit is open, then waits for request and token budget."""
+        if not self.breaker.allow():
+            count("llm_circuit_rejections")
+            raise CircuitOpenError("LLM calls are paused after repeated failures; try again shortly")
+        if self._requests:
+            self._requests.acquire()
+        if self._tokens:
+            self._tokens.acquire(cost)
+
+    def _should_retry(self, error, attempt):
+        """Records a failed attempt and returns True after backing off if it should be retried."""
+        if not is_retryable(error):
+            # Auth and request errors will not fix themselves, but they show the service is reachable
+            self.breaker.record_success()
+            count("llm_fatal_errors")
+            return False
+        self.breaker.record_failure()
+        if attempt == self.max_retries:
+            count("llm_retries_exhausted")
+            return False
+        delay = self._backoff(attempt)
+        count("llm_retries")
+        observe("llm_backoff_seconds", delay)
+        time.sleep(delay)
+        return True
+
+    def invoke(self, prompt, **kwargs):
+        cost = estimate_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            self._before_call(cost)
+            try:
+                with self._semaphore:
+                    response = self._llm.invoke(prompt, **kwargs)
+            except Exception as e:
+                if self._should_retry(e, attempt):
+                    continue
+                raise
+            self.breaker.record_success()
+            return response
+
+    def stream(self, prompt, **kwargs):
+        """Like `invoke`, but yields response chunks; failures are only retried before the first chunk."""
+        cost = estimate_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            self._before_call(cost)
+            started = False
+            try:
+                with self._semaphore:
+                    for chunk in self._llm.stream(prompt, **kwargs):
+                        started = True
+                        yield chunk
+            except Exception as e:
+                if started:
+                    # Part of the response was already delivered, so a retry would repeat it
+                    if is_retryable(e):
+                        self.breaker.record_failure()
+                    raise
+                if self._should_retry(e, attempt):
+                    continue
+                raise
+            self.breaker.record_success()
+            return
@@ -0,0 +1,113 @@
+import hashlib
+import random
+import re
+import threading
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+WORD = re.compile(r"\w+")
+
+
+def shingles(text, size=5):
+    """Returns the set of hashed `size`-word shingles of the lowercased text."""
+    words = WORD.findall(text.lower())
+    size = max(1, min(size, len(words)))  # Very short texts form a single shingle
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + size]).encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(len(words) - size + 1)
+    }
+
+
+class MinHasher:
+    """Computes MinHash signatures whose agreement estimates the Jaccard similarity of two shingle sets."""
+
+    def __init__(self, num_perm=64, shingle_size=5, seed=1):
+        generator = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._permutations = [
+            (generator.randrange(1, MERSENNE_PRIME), generator.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+
+    def signature(self, text):
+        hashed = shingles(text, self.shingle_size)
+        if not hashed:
+            return [MAX_HASH] * self.num_perm
+        return [
+            min(((a * value + b) % MERSENNE_PRIME) & MAX_HASH for value in hashed)
+            for a, b in self._permutations
+        ]
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+class NearDuplicateIndex:
+    """Locality-sensitive hashing index over MinHash signatures.
+
+    Signatures are split into `bands`; pages sharing any band become candidates, and a
+    candidate whose estimated similarity reaches `threshold` is reported as a near duplicate.
+    """
+
+    def __init__(self, hasher=None, bands=16, threshold=0.9):
+        self.hasher = hasher or MinHasher()
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.threshold = threshold
+        self._buckets = {}
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature):
+        return [(band, tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def _best_match(self, signature):
+        candidates = {key for band in self._band_keys(signature) for key in self._buckets.get(band, ())}
+        best = max(
+            ((key, similarity(signature, self._signatures[key])) for key in candidates),
+            key=lambda item: item[1],
+            default=None,
+        )
+        return best if best and best[1] >= self.threshold else None
+
+    def _insert(self, key, signature):
+        self._signatures[key] = signature
+        for band in self._band_keys(signature):
+            self._buckets.setdefault(band, set()).add(key)
+
+    def find(self, signature):
+        """Returns (key, similarity) of the most similar indexed page at or above the threshold, or None."""
+        with self._lock:
+            return self._best_match(signature)
+
+    def add(self, key, signature):
+        with self._lock:
+            self._insert(key, signature)
+
+    def remove(self, key):
+        """Removes a page, e.g. one whose analysis failed, so later pages are no longer matched against it."""
+        with self._lock:
+            signature = self._signatures.pop(key, None)
+            if signature is None:
+                return
+            for band in self._band_keys(signature):
+                keys = self._buckets.get(band)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._buckets[band]
+
+    def check_and_add(self, key, text):
+        """Fingerprints `text`; returns (signature, duplicate) where duplicate is (key, similarity) or None.
+
+        Pages that are not duplicates are added to the index, atomically with the lookup so
+        two workers cannot both register the same content as original.
+        """
+        signature = self.hasher.signature(text)
+        with self._lock:
+            duplicate = self._best_match(signature)
+            if duplicate is None:
+                self._insert(key, signature)
+        return signature, duplicate
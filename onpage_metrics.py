@@ -0,0 +1,208 @@
+import re
+from statistics import median
+
+from section_tree import HEADING_LEVELS
+
+# Rule-of-thumb targets the findings are measured against
+TITLE_LENGTH = (30, 60)  # Characters; longer titles are truncated in search results
+META_DESCRIPTION_LENGTH = (120, 160)  # Characters
+KEYWORD_DENSITY = (0.5, 2.5)  # Percent of words
+DENSE_PARAGRAPH_WORDS = 120
+TEXT_PER_HEADING_WORDS = 300  # Longest stretch of text that is still easy to scan without a subheading
+LIST_WORTHY_WORDS = 600  # Posts at least this long usually benefit from a list
+
+MISSING_TITLE = "No title found"
+MISSING_META_DESCRIPTION = "No meta description found"
+NO_SUGGESTIONS = "No Suggestions"
+WORD = re.compile(r"\w+")
+TITLE_SUFFIX = re.compile(r"\s+[|\-–—:]\s+[^|\-–—:]+$")  # " | Site name" style suffixes
+
+
+def _word_count(text):
+    return len(WORD.findall(text))
+
+
+def _normalized(text):
+    return " ".join(WORD.findall(text.lower()))
+
+
+def compute_onpage_metrics(page, keyword_stats=None):
+    """Measures title, meta description, heading, paragraph and list structure in one pass over the content blocks.
+
+    Keyword placement and density come from the keyword statistics, when available.
+    """
+    headings = []
+    paragraphs = []
+    list_count = list_items = 0
+    words = words_since_heading = longest_without_heading = 0
+    previous_tag = None
+    for tag, text in page["blocks"]:
+        block_words = _word_count(text)
+        if tag in HEADING_LEVELS:
+            headings.append((HEADING_LEVELS[tag], text.strip()))
+            longest_without_heading = max(longest_without_heading, words_since_heading)
+            words_since_heading = 0
+            previous_tag = tag
+            continue
+        if tag == "li":
+            list_items += 1
+            list_count += previous_tag != "li"  # Consecutive items form one list
+        elif block_words:
+            paragraphs.append(block_words)
+        words += block_words
+        words_since_heading += block_words
+        previous_tag = tag
+    longest_without_heading = max(longest_without_heading, words_since_heading)
+
+    title = page["title"] if page["title"] != MISSING_TITLE else ""
+    meta_description = page["meta_description"] if page["meta_description"] != MISSING_META_DESCRIPTION else ""
+    h1s = [text for level, text in headings if level == 1]
+    levels = [level for level, _ in headings]
+    title_core = _normalized(TITLE_SUFFIX.sub("", title))
+    return {
+        "title_length": len(title),
+        "meta_description_length": len(meta_description),
+        "h1_count": len(h1s),
+        "h1_matches_title": bool(title_core) and any(
+            title_core in _normalized(h1) or _normalized(h1) in title_core for h1 in h1s if _normalized(h1)
+        ),
+        "heading_count": len(headings),
+        "skipped_heading_levels": [
+            f"H{previous} → H{level}" for previous, level in zip(levels, levels[1:]) if level > previous + 1
+        ],
+        "longest_text_without_heading": longest_without_heading,
+        "word_count": words,
+        "paragraph_count": len(paragraphs),
+        "median_paragraph_words": median(paragraphs) if paragraphs else 0,
+        "longest_paragraph_words": max(paragraphs, default=0),
+        "dense_paragraphs": sum(count > DENSE_PARAGRAPH_WORDS for count in paragraphs),
+        "list_count": list_count,
+        "list_items": list_items,
+        "keywords": (keyword_stats or {}).get("keywords") or [],
+        "section_count": (keyword_stats or {}).get("section_count", 0),
+    }
+
+
+def _finding(guideline, analysis, suggestions=None):
+    return f"{guideline}: {analysis}", suggestions or NO_SUGGESTIONS
+
+
+def _length_finding(guideline, label, length, bounds):
+    low, high = bounds
+    if not length:
+        return _finding(guideline, f"The page has no {label}.", f"Add a {label} of {low}-{high} characters.")
+    analysis = f"The {label} is {length} characters long (recommended: {low}-{high})."
+    if length > high:
+        return _finding(guideline, analysis, f"Shorten the {label} to at most {high} characters so it is not truncated in search results.")
+    if length < low:
+        return _finding(guideline, analysis, f"Lengthen the {label} toward {high} characters to use the space search results show.")
+    return _finding(guideline, analysis)
+
+
+def _placement_finding(guideline, keyword, field, place):
+    if keyword is None:
+        return _finding(guideline, "Keyword statistics are not available, so keyword placement could not be measured.")
+    if keyword[field]:
+        return _finding(guideline, f'The most frequent keyword "{keyword["keyword"]}" appears in the {place}.')
+    return _finding(
+        guideline,
+        f'The most frequent keyword "{keyword["keyword"]}" does not appear in the {place}.',
+        f'Include "{keyword["keyword"]}" (or the intended primary keyword) in the {place}.',
+    )
+
+
+def keyword_findings(metrics):
+    """Deterministic keyword optimization findings as (analysis, suggestions) pairs."""
+    keywords = metrics["keywords"]
+    primary = keywords[0] if keywords else None
+    findings = [
+        _placement_finding("Primary Keyword in Page Title", primary, "in_title", "page title"),
+        _length_finding("Page Title Character Length", "page title", metrics["title_length"], TITLE_LENGTH),
+    ]
+
+    h1_count = metrics["h1_count"]
+    if h1_count == 0:
+        findings.append(_finding("Page Title HTML Structure", "The content has no H1 heading.",
+                                 "Wrap the post title in a single H1 tag."))
+    elif h1_count > 1:
+        findings.append(_finding("Page Title HTML Structure", f"The content has {h1_count} H1 headings.",
+                                 "Keep one H1 for the post title and use H2/H3 for the other headings."))
+    elif not metrics["h1_matches_title"]:
+        findings.append(_finding("Page Title HTML Structure", "The content has one H1, but it does not match the page title.",
+                                 "Align the H1 with the page title so both target the same keyword."))
+    else:
+        findings.append(_finding("Page Title HTML Structure", "The page title is wrapped in the content's single H1 heading."))
+
+    findings.append(_placement_finding("Primary Keyword in Meta Description", primary, "in_meta_description", "meta description"))
+    findings.append(_length_finding("Meta Description Length", "meta description", metrics["meta_description_length"],
+                                    META_DESCRIPTION_LENGTH))
+    findings.append(_placement_finding("Primary Keyword in URL", primary, "in_url", "URL"))
+    findings.append(_placement_finding("Primary Keyword in First Sentence", primary, "in_first_sentence", "first sentence"))
+
+    if primary is None:
+        findings.append(_finding("Keyword Density", "Keyword statistics are not available, so density could not be measured."))
+    else:
+        low, high = KEYWORD_DENSITY
+        analysis = f'"{primary["keyword"]}" makes up {primary["density"]}% of {metrics["word_count"]} words (recommended: {low}-{high}%).'
+        if primary["density"] > high:
+            suggestions = "Replace some repetitions with variations or synonyms to avoid keyword stuffing."
+        elif primary["density"] < low:
+            suggestions = f'Use "{primary["keyword"]}" a few more times where it reads naturally.'
+        else:
+            suggestions = None
+        findings.append(_finding("Keyword Density", analysis, suggestions))
+
+    if keywords and metrics["section_count"] > 1:
+        sections = metrics["section_count"]
+        spread = ", ".join(f'"{k["keyword"]}" {k["sections_with_keyword"]}/{sections}' for k in keywords[:5])
+        narrow = [k["keyword"] for k in keywords[:5] if k["sections_with_keyword"] <= 1]
+        findings.append(_finding(
+            "Top 5 Keywords Distribution",
+            f"Sections containing each top keyword: {spread}.",
+            f"Work {', '.join(map(repr, narrow))} into more sections." if narrow else None,
+        ))
+    return findings
+
+
+def content_findings(metrics):
+    """Deterministic content quality findings as (analysis, suggestions) pairs."""
+    findings = []
+    if metrics["paragraph_count"]:
+        dense = metrics["dense_paragraphs"]
+        findings.append(_finding(
+            "Paragraph Structure",
+            f"{metrics['paragraph_count']} paragraphs with a median of {metrics['median_paragraph_words']:g} words; "
+            f"the longest has {metrics['longest_paragraph_words']} words and {dense} exceed {DENSE_PARAGRAPH_WORDS} words.",
+            f"Split the {dense} paragraph(s) over {DENSE_PARAGRAPH_WORDS} words into shorter ones." if dense else None,
+        ))
+
+    issues = []
+    suggestions = []
+    if metrics["skipped_heading_levels"]:
+        issues.append("skipped levels: " + ", ".join(metrics["skipped_heading_levels"]))
+        suggestions.append("Nest headings without skipping levels.")
+    if metrics["longest_text_without_heading"] > TEXT_PER_HEADING_WORDS:
+        issues.append(f"up to {metrics['longest_text_without_heading']} words run without a heading")
+        suggestions.append(f"Add subheadings at least every {TEXT_PER_HEADING_WORDS} words.")
+    findings.append(_finding(
+        "Heading Structure",
+        f"{metrics['heading_count']} headings" + (f"; {'; '.join(issues)}." if issues else " with no skipped levels."),
+        " ".join(suggestions) or None,
+    ))
+
+    if metrics["list_count"]:
+        findings.append(_finding("Use of Lists", f"{metrics['list_count']} list(s) with {metrics['list_items']} items."))
+    elif metrics["word_count"] >= LIST_WORTHY_WORDS:
+        findings.append(_finding("Use of Lists", f"No lists in {metrics['word_count']} words.",
+                                 "Turn steps, options or key points into bullet or numbered lists."))
+    else:
+        findings.append(_finding("Use of Lists", "No lists; the post is short enough to read without them."))
+    return findings
+
+
+def onpage_findings(metrics):
+    """Returns {analysis section key: [(analysis, suggestions), ...]} for the measured guidelines."""
+    return {
+        "keyword_optimization": keyword_findings(metrics),
+        "content_quality": content_findings(metrics),
+    }
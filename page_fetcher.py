@@ -0,0 +1,205 @@
+import codecs
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+FetchedPage = namedtuple(
+    "FetchedPage", ["url", "size", "text", "encoding", "truncated", "status_code", "not_modified", "retries"]
+)
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 16 * 1024  # Bytes buffered to find a <meta charset> or guess the encoding before decoding starts
+CHARSET = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+
+class UnsupportedContentType(requests.exceptions.RequestException):
+    """The response is not an HTML page, so its body was not downloaded."""
+
+
+def _codec(name):
+    """Returns the codec for a declared charset, or None if Python does not know it.
+
+    Latin-1 is read as windows-1252, its superset, as browsers do.
+    """
+    try:
+        codec = codecs.lookup(name.strip()).name if name else None
+    except LookupError:
+        return None
+    return "cp1252" if codec in ("iso8859-1", "ascii") else codec
+
+
+def detect_encoding(content_type, head):
+    """Picks the encoding of a page from its byte-order mark, Content-Type charset or <meta> charset.
+
+    Undeclared pages are read as UTF-8 if their first bytes are valid UTF-8, otherwise as windows-1252.
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    declared = CHARSET.search(content_type or "")
+    encoding = _codec(declared and declared.group(1))
+    if encoding:
+        return encoding
+    declared = META_CHARSET.search(head[:SNIFF_BYTES])
+    encoding = _codec(declared and declared.group(1).decode("ascii", "ignore"))
+    if encoding:
+        return encoding
+    try:  # Not final: the sample may end inside a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(head[:SNIFF_BYTES])
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1252"  # Statistical detectors misread short Western pages; this is the HTML default for them
+
+
+class PageFetcher:
+    """HTTP fetcher with pooled keep-alive connections, retries and a conditional-GET page cache.
+
+    One session is shared by every caller, so concurrent workers reuse connections per host.
+    Pages served with an `ETag` or `Last-Modified` header are stored in `cache_dir`; later
+    fetches send `If-None-Match`/`If-Modified-Since` and reuse the stored HTML on a 304.
+
+    Bodies are streamed: responses that are not HTML are rejected from their headers
+    alone, and reading stops after `max_bytes` (0 for no limit), so an oversized page
+    costs at most that much memory. Chunks are decoded as they arrive, and the raw bytes are
+    only held for pages that are written to the cache.
+    """
+
+    def __init__(self, cache_dir=None, pool_size=32, retries=3, timeout=10, max_bytes=0):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": "Mozilla/5.0 (compatible; BlogSEOAnalyzer/1.0)",
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.html"), os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_cached(self, url):
+        """Returns (validators, body) for a cached page, or (None, None) if it is not cached."""
+        if not self.cache_dir:
+            return None, None
+        body_path, meta_path = self._cache_paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as handle:
+                validators = json.load(handle)
+            with open(body_path, "rb") as handle:
+                return validators, handle.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def _store(self, url, validators, body):
+        """Writes the page and its validators atomically so concurrent readers never see partial files."""
+        body_path, meta_path = self._cache_paths(url)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(body_path + suffix, "wb") as handle:
+            handle.write(body)
+        with open(meta_path + suffix, "w", encoding="utf-8") as handle:
+            json.dump(validators, handle)
+        os.replace(body_path + suffix, body_path)
+        os.replace(meta_path + suffix, meta_path)
+
+    def _read(self, response, keep_body):
+        """Streams the body up to `max_bytes`; returns (body, text, encoding, truncated, size).
+
+        Once decoding has started the raw bytes are only kept when `keep_body` asks for them
+        (to write the cache); otherwise body is None and only the decoded text is held.
+        """
+        chunks = []
+        pieces = []
+        size = 0
+        decoder = None
+        truncated = False
+        for chunk in response.iter_content(CHUNK_SIZE):  # Decompressed, so the cap also bounds gzip bombs
+            if self.max_bytes and size + len(chunk) > self.max_bytes:
+                chunk = chunk[:self.max_bytes - size]
+                truncated = True
+            size += len(chunk)
+            if decoder is not None:
+                pieces.append(decoder.decode(chunk))
+                if keep_body:
+                    chunks.append(chunk)
+            else:
+                chunks.append(chunk)
+                if size >= SNIFF_BYTES:
+                    encoding = detect_encoding(response.headers.get("Content-Type"), b"".join(chunks))
+                    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                    pieces.extend(decoder.decode(earlier) for earlier in chunks)
+                    if not keep_body:
+                        chunks = []
+            if truncated:
+                break
+        response.close()  # Drops the connection if the body was cut short
+        if decoder is None:
+            body = b"".join(chunks)
+            encoding = detect_encoding(response.headers.get("Content-Type"), body)
+            return body, body.decode(encoding, errors="replace"), encoding, truncated, size
+        pieces.append(decoder.decode(b"", final=True))
+        return b"".join(chunks) if keep_body else None, "".join(pieces), encoding, truncated, size
+
+    def fetch(self, url):
+        """Fetches a page, revalidating any cached copy with a conditional GET.
+
+        Raises UnsupportedContentType for responses that are not HTML.
+        """
+        validators, cached_body = self._load_cached(url)
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+        retry_state = getattr(response.raw, "retries", None)
+        retries = len(retry_state.history) if retry_state else 0
+        if response.status_code == 304 and cached_body is not None:
+            response.close()
+            encoding = validators.get("encoding") or detect_encoding(None, cached_body)
+            return FetchedPage(
+                url, len(cached_body), cached_body.decode(encoding, errors="replace"), encoding,
+                validators.get("truncated", False), 304, True, retries,
+            )
+        try:
+            response.raise_for_status()  # Raises an exception for bad status codes
+            content_type = response.headers.get("Content-Type", "")
+            media_type = content_type.split(";")[0].strip().lower()
+            if media_type and media_type not in HTML_CONTENT_TYPES:
+                raise UnsupportedContentType(f"{url} is {media_type}, not an HTML page", response=response)
+        except requests.exceptions.RequestException:
+            response.close()
+            raise
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        cacheable = bool(self.cache_dir and (etag or last_modified))
+        body, text, encoding, truncated, size = self._read(response, keep_body=cacheable)
+        if cacheable:
+            validators = {"etag": etag, "last_modified": last_modified, "encoding": encoding, "truncated": truncated}
+            self._store(url, validators, body)
+        return FetchedPage(url, size, text, encoding, truncated, response.status_code, False, retries)
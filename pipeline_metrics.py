@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class PipelineMetrics:
+    """Thread-safe counters and summary observations (count, sum, max) for pipeline stages.
+
+    Stage durations are observed as `<stage>_seconds`; sizes such as prompt characters or
+    token estimates are observed under their own names.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.observations = {}
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self._lock:
+            summary = self.observations.setdefault(name, {"count": 0, "sum": 0.0, "max": 0.0})
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["max"] = max(summary["max"], value)
+
+    def snapshot(self):
+        """Returns a JSON-serializable copy of all counters and observations."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "observations": {name: dict(summary) for name, summary in self.observations.items()},
+            }
+
+    def to_prometheus(self, prefix="blog_seo"):
+        """Renders the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+        for name, summary in sorted(snapshot["observations"].items()):
+            lines += [
+                f"# TYPE {prefix}_{name} summary",
+                f"{prefix}_{name}_count {summary['count']}",
+                f"{prefix}_{name}_sum {summary['sum']}",
+                f"# TYPE {prefix}_{name}_max gauge",
+                f"{prefix}_{name}_max {summary['max']}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.snapshot(), handle, indent=2)
+
+
+# Process-wide totals, plus an optional per-run trace bound to the current thread
+METRICS = PipelineMetrics()
+_local = threading.local()
+
+
+def current_trace():
+    """Returns the per-run metrics bound to this thread, if any."""
+    return getattr(_local, "trace", None)
+
+
+@contextmanager
+def tracing(trace):
+    """Binds `trace` to the current thread so recorded metrics also land in it."""
+    previous = current_trace()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+
+def count(name, value=1):
+    """Increments a counter in the process-wide metrics and the current trace."""
+    METRICS.increment(name, value)
+    trace = current_trace()
+    if trace is not None:
+        trace.increment(name, value)
+
+
+def observe(name, value):
+    """Records an observation in the process-wide metrics and the current trace."""
+    METRICS.observe(name, value)
+    trace = current_trace()
+    if trace is not None:
+        trace.observe(name, value)
+
+
+@contextmanager
+def timed(stage):
+    """Observes the wall-clock duration of the wrapped block as `<stage>_seconds`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(f"{stage}_seconds", time.perf_counter() - start)
+
+
+def serve_metrics(port, metrics=METRICS, host="127.0.0.1"):
+    """Serves the metrics at http://<host>:<port>/metrics from a daemon thread."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") == "/metrics.json":
+                body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+            elif self.path.rstrip("/") in ("", "/metrics"):
+                body, content_type = metrics.to_prometheus().encode(), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
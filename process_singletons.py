@@ -0,0 +1,47 @@
+import functools
+import threading
+
+# Kept in an imported module so instances survive Streamlit re-executing the app script on every rerun
+_instances = {}
+_failures = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def _unavailable(key):
+    failure = _failures[key]
+    raise RuntimeError(f"{key} is unavailable: {failure}") from failure
+
+
+def process_singleton(factory):
+    """Decorates a zero-argument factory so every caller in the process shares one instance.
+
+    Safe to call from any thread, inside or outside a Streamlit script run; the first caller
+    creates the instance while concurrent callers wait for it. A factory that raises is not
+    tried again: its first caller gets the error and later calls raise a RuntimeError at
+    once, without taking the lock, so callers fall back without paying for the failure again.
+    """
+    key = f"{factory.__module__}.{factory.__qualname__}"
+
+    @functools.wraps(factory)
+    def get():
+        try:
+            return _instances[key]
+        except KeyError:
+            pass
+        if key in _failures:
+            _unavailable(key)
+        with _registry_lock:
+            lock = _locks.setdefault(key, threading.Lock())
+        with lock:
+            if key in _failures:
+                _unavailable(key)
+            if key not in _instances:
+                try:
+                    _instances[key] = factory()
+                except Exception as e:
+                    _failures[key] = e
+                    raise
+            return _instances[key]
+
+    return get
@@ -0,0 +1,86 @@
+import math
+import re
+
+CHARS_PER_TOKEN = 4  # Rough average for English text with Gemini's tokenizer
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    """Estimates the number of LLM tokens in `text` without a network call."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def split_sentences(text):
+    """Splits text into sentences on ., ! and ? followed by whitespace."""
+    return [sentence for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def compact_text(text):
+    """Drops repeated sentences (navigation, share widgets and other boilerplate) keeping the first occurrence."""
+    seen = set()
+    kept = []
+    for sentence in split_sentences(text):
+        normalized = " ".join(sentence.lower().split())
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        kept.append(sentence.strip())
+    return " ".join(kept)
+
+
+def chunk_text(text, max_tokens):
+    """Packs whole sentences into chunks of at most `max_tokens` estimated tokens each.
+
+    Sentences longer than the budget on their own are split on word boundaries.
+    """
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    pieces = []
+    for sentence in split_sentences(text):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+
+    chunks = []
+    current = []
+    current_len = 0
+    for piece in pieces:
+        if current and current_len + 1 + len(piece) > max_chars:
+            chunks.append(" ".join(current))
+            current, current_len = [], 0
+        current.append(piece)
+        current_len += len(piece) + (1 if current_len else 0)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def merge_guideline_lines(chunk_results):
+    """Merges per-chunk LLM output lines into one line per guideline.
+
+    Each line is expected as "Guideline: analysis. Suggestions: suggestions". Analyses for
+    the same guideline are concatenated in chunk order and distinct suggestions are kept.
+    """
+    merged = {}
+    for lines in chunk_results:
+        for line in lines:
+            analysis, _, suggestions = line.partition("Suggestions:")
+            label, separator, body = analysis.partition(":")
+            if not separator or not label.strip():
+                continue
+            entry = merged.setdefault(label.strip(), {"analyses": [], "suggestions": []})
+            body = body.strip()
+            if body and body not in entry["analyses"]:
+                entry["analyses"].append(body)
+            suggestions = suggestions.strip()
+            if suggestions and suggestions != "No Suggestions" and suggestions not in entry["suggestions"]:
+                entry["suggestions"].append(suggestions)
+
+    return [
+        f"{label}: {' '.join(entry['analyses'])} Suggestions: {' '.join(entry['suggestions']) or 'No Suggestions'}"
+        for label, entry in merged.items()
+    ]
@@ -0,0 +1,104 @@
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+# Counting rules of textstat 0.7, so scores match textstat.flesch_kincaid_grade / flesch_reading_ease
+SENTENCE = re.compile(r"\b[^.!?]+[.!?]*")
+QUOTE = re.compile(r"'(?![tsd]\b|ve\b|ll\b|re\b)")  # Single quotes that are not part of a contraction
+PUNCTUATION = re.compile(r"[^\w\s']")
+
+TARGET_GRADE = 8  # Sections above this Flesch-Kincaid grade are candidates for simplification
+MIN_SECTION_WORDS = 30  # Shorter sections give unstable scores and are not ranked
+HARDEST_SECTIONS = 3
+EXAMPLE_SENTENCE_CHARS = 240
+
+
+def _round(number, points):
+    """Rounds half away from zero, as textstat does."""
+    scale = 10 ** points
+    return math.floor(number * scale + math.copysign(0.5, number)) / scale
+
+
+def _words(text):
+    return PUNCTUATION.sub("", QUOTE.sub('"', text)).split()
+
+
+class ReadabilityEngine:
+    """Flesch-Kincaid grade and Flesch Reading Ease for a page and each of its sections.
+
+    Syllables are counted once per distinct word (hyphenation lookups dominate the cost),
+    and scores are cached by text hash, so unchanged sections of an edited post and pages
+    repeated across a batch are not scored again.
+    """
+
+    def __init__(self, lang="en_US", cache_size=4096):
+        from pyphen import Pyphen  # Deferred: loading the hyphenation dictionary slows startup
+
+        hyphenator = Pyphen(lang=lang)
+        self.syllables = lru_cache(maxsize=200_000)(lambda word: len(hyphenator.positions(word)) + 1)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def score(self, text):
+        """Returns sentence, word and syllable counts, grade, ease and the longest sentence of `text`.
+
+        Grade and ease are None for text without words.
+        """
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        words = _words(text)
+        syllables = sum(self.syllables(word) for word in _words(text.lower()))
+        sentences = [(len(_words(sentence)), sentence) for sentence in SENTENCE.findall(text)]
+        sentence_count = max(1, sum(length > 2 for length, _ in sentences))  # textstat ignores 1-2 word fragments
+        longest = max(sentences, default=(0, ""))[1].strip()
+        scores = {
+            "sentences": sentence_count,
+            "words": len(words),
+            "syllables": syllables,
+            "grade": None,
+            "ease": None,
+            "longest_sentence": longest[:EXAMPLE_SENTENCE_CHARS] + ("…" if len(longest) > EXAMPLE_SENTENCE_CHARS else ""),
+        }
+        if words:
+            words_per_sentence = _round(len(words) / sentence_count, 1)
+            syllables_per_word = _round(syllables / len(words), 1)
+            scores["grade"] = _round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 1)
+            scores["ease"] = _round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 2)
+
+        with self._lock:
+            self._cache[key] = scores
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return scores
+
+    def analyze(self, content, sections=()):
+        """Scores the whole content and every section of a section tree.
+
+        Returns {"grade", "ease", "sections", "hardest"}, where "hardest" lists the indexes
+        of up to HARDEST_SECTIONS sections above TARGET_GRADE, hardest first.
+        """
+        overall = self.score(content)
+        scored = [
+            {"heading": section["heading"], "path": section["path"], **self.score(section["text"])}
+            for section in sections
+        ]
+        ranked = sorted(
+            (index for index, section in enumerate(scored)
+             if section["words"] >= MIN_SECTION_WORDS and section["grade"] > TARGET_GRADE),
+            key=lambda index: scored[index]["grade"],
+            reverse=True,
+        )
+        return {
+            "grade": overall["grade"],
+            "ease": overall["ease"],
+            "sections": scored,
+            "hardest": ranked[:HARDEST_SECTIONS],
+        }
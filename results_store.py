@@ -0,0 +1,259 @@
+"""History of analysis runs for the Blog SEO Analyzer, kept in SQLite.
+
+Every analysis from the app, batch mode or the crawler is recorded with its readability
+scores, content hash, timings and parsed guideline findings, so site-wide questions can be
+answered from the database without re-running anything:
+
+    python results_store.py readability-drops
+    python results_store.py flagged "Primary Keyword in Meta Description"
+    python results_store.py history https://blog.example.com/post
+"""
+import argparse
+import json
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+NO_SUGGESTIONS = {"", "no suggestions", "none", "n/a"}
+LABEL_DECORATION = re.compile(r"^[\s*#>\-•\d.)]+|[\s*]+$")  # Markdown bullets, numbering and bold around a label
+_STOP = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    analyzed_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    content_hash TEXT,
+    grade REAL,
+    ease REAL,
+    word_count INTEGER,
+    elapsed_seconds REAL,
+    timings TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_url ON runs (url, analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_runs_analyzed ON runs (analyzed_at);
+CREATE TABLE IF NOT EXISTS findings (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    url TEXT NOT NULL,
+    analyzed_at REAL NOT NULL,
+    section TEXT NOT NULL,
+    guideline TEXT NOT NULL COLLATE NOCASE,
+    analysis TEXT NOT NULL,
+    suggestions TEXT NOT NULL,
+    flagged INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_findings_guideline ON findings (guideline, run_id);
+CREATE INDEX IF NOT EXISTS idx_findings_run ON findings (run_id, section, guideline, flagged);
+-- The newest successful run of every URL, with the previous run's score, kept up to date on insert
+CREATE TABLE IF NOT EXISTS latest_runs (
+    url TEXT PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    analyzed_at REAL NOT NULL,
+    ease REAL,
+    previous_ease REAL
+);
+CREATE INDEX IF NOT EXISTS idx_latest_runs_run ON latest_runs (run_id);
+"""
+
+
+def split_finding(analysis):
+    """Splits an analysis line "Guideline: text" into (guideline, text); lines without a label get "Other"."""
+    label, separator, text = analysis.partition(":")
+    label = LABEL_DECORATION.sub("", label)
+    if not separator or not label or len(label) > 80:
+        return "Other", analysis.strip()
+    return label, text.strip()
+
+
+def _timings(metrics):
+    """Reduces a metrics snapshot to total seconds per stage."""
+    observations = (metrics or {}).get("observations", {})
+    return {name: round(summary["sum"], 3) for name, summary in observations.items() if name.endswith("_seconds")}
+
+
+class ResultsStore:
+    """Append-only run history with a background writer.
+
+    `add` only queues a record; a writer thread commits everything queued so far in one
+    transaction, so batches grow with the write load and recording never blocks a worker
+    on disk. Queries use a separate connection and see committed runs (WAL mode lets them
+    read while the writer commits).
+    """
+
+    def __init__(self, path, max_batch=500):
+        self.path = path
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._reader = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._reader.execute("PRAGMA journal_mode=WAL")
+        self._reader.executescript(SCHEMA)
+        self._reader.commit()
+        self._writer = threading.Thread(target=self._write_loop, name="results-store-writer", daemon=True)
+        self._writer.start()
+
+    def add(self, record, source):
+        """Queues an analysis record (a batch/crawl record or an app result with status and timings)."""
+        self._queue.put((dict(record), source, time.time()))
+
+    def flush(self, timeout=10):
+        """Blocks until every queued record is written, or `timeout` seconds pass; returns True if all were."""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._writer.join()
+        with self._lock:
+            self._reader.close()
+
+    def _write_loop(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; a crash can only lose the last commits
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [item for item in batch if item is not _STOP]
+            # Keep the writer alive whatever fails; losing history must not break analyses
+            try:
+                with conn:
+                    conn.execute("BEGIN")
+                    for record, source, analyzed_at in records:
+                        # A record that cannot be stored is rolled back alone, not with the whole batch
+                        conn.execute("SAVEPOINT record")
+                        try:
+                            self._insert(conn, record, source, analyzed_at)
+                        except Exception as e:
+                            conn.execute("ROLLBACK TO record")
+                            print(f"Error writing the result for {record.get('url')} to {self.path}: {e}", file=sys.stderr)
+                        conn.execute("RELEASE record")
+            except Exception as e:
+                print(f"Error writing {len(records)} results to {self.path}: {e}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(records) < len(batch):
+                conn.close()
+                return
+
+    @staticmethod
+    def _insert(conn, record, source, analyzed_at):
+        readability = record.get("readability") or {}
+        keyword_stats = record.get("keyword_stats") or {}
+        url = record["url"]
+        run_id = conn.execute(
+            "INSERT INTO runs (url, analyzed_at, source, status, content_hash, grade, ease, word_count, "
+            "elapsed_seconds, timings) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                url, analyzed_at, source, record.get("status", "ok"), record.get("content_hash"),
+                readability.get("grade"), readability.get("ease"), keyword_stats.get("word_count"),
+                record.get("elapsed_seconds"), json.dumps(_timings(record.get("metrics"))),
+            ),
+        ).lastrowid
+        rows = []
+        # Measured on-page findings and LLM findings are stored alike
+        findings = [
+            (section, line)
+            for group in (record.get("onpage") or {}, record.get("sections") or {})
+            for section, lines in group.items()
+            for line in lines
+        ]
+        for section, (analysis, suggestions) in findings:
+            guideline, text = split_finding(analysis)
+            suggestions = (suggestions or "").strip()
+            flagged = suggestions.rstrip(".").lower() not in NO_SUGGESTIONS
+            rows.append((run_id, url, analyzed_at, section, guideline, text, suggestions, int(flagged)))
+        conn.executemany("INSERT INTO findings VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        if record.get("status", "ok") in ("ok", "partial"):
+            conn.execute(
+                """INSERT INTO latest_runs VALUES (?, ?, ?, ?, NULL)
+                   ON CONFLICT (url) DO UPDATE SET run_id = excluded.run_id, analyzed_at = excluded.analyzed_at,
+                       previous_ease = latest_runs.ease, ease = excluded.ease""",
+                (url, run_id, analyzed_at, readability.get("ease")),
+            )
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            cursor = self._reader.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def history(self, url, limit=20):
+        """Returns the most recent runs of a URL, newest first."""
+        return self._query(
+            "SELECT analyzed_at, source, status, content_hash, grade, ease, word_count, elapsed_seconds "
+            "FROM runs WHERE url = ? ORDER BY analyzed_at DESC LIMIT ?",
+            (url, limit),
+        )
+
+    def readability_drops(self, min_drop=0.0, since=None):
+        """Returns URLs whose latest Flesch Reading Ease is more than `min_drop` below their previous run's."""
+        return self._query(
+            "SELECT url, analyzed_at, previous_ease, ease, ROUND(ease - previous_ease, 2) AS change "
+            "FROM latest_runs WHERE ease < previous_ease - ? AND analyzed_at >= ? ORDER BY change",
+            (min_drop, since or 0),
+        )
+
+    def flagged(self, guideline, contains=None):
+        """Returns the latest finding per URL for a guideline that came with suggestions.
+
+        `contains` further filters on text in the analysis or suggestions, e.g. "missing".
+        """
+        sql = (
+            "SELECT findings.url, findings.analyzed_at, analysis, suggestions FROM findings "
+            "JOIN latest_runs USING (run_id) WHERE guideline = ? AND flagged = 1"
+        )
+        params = [guideline]
+        if contains:
+            sql += " AND (analysis LIKE ? OR suggestions LIKE ?)"
+            params += [f"%{contains}%"] * 2
+        return self._query(sql + " ORDER BY findings.url", params)
+
+    def guideline_summary(self):
+        """Returns, per guideline, how many URLs' latest runs were flagged out of those that assessed it."""
+        return self._query(
+            """SELECT section, guideline, SUM(flagged) AS flagged, COUNT(*) AS assessed
+               FROM latest_runs CROSS JOIN findings USING (run_id)  -- CROSS JOIN keeps latest_runs as the outer loop
+               GROUP BY section, guideline ORDER BY flagged DESC, guideline"""
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the history of Blog SEO Analyzer runs.")
+    parser.add_argument("--db", default="results.sqlite3", help="Results database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    history = commands.add_parser("history", help="Recent runs of one URL")
+    history.add_argument("url")
+    drops = commands.add_parser("readability-drops", help="URLs whose Flesch Reading Ease dropped since their previous run")
+    drops.add_argument("--min-drop", type=float, default=0.0)
+    flagged = commands.add_parser("flagged", help="URLs whose latest run has suggestions for a guideline")
+    flagged.add_argument("guideline")
+    flagged.add_argument("--contains", help="Only findings mentioning this text")
+    commands.add_parser("summary", help="Flagged URL counts per guideline")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db)
+    if args.command == "history":
+        rows = store.history(args.url)
+    elif args.command == "readability-drops":
+        rows = store.readability_drops(args.min_drop)
+    elif args.command == "flagged":
+        rows = store.flagged(args.guideline, args.contains)
+    else:
+        rows = store.guideline_summary()
+    store.close()
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
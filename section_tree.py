@@ -0,0 +1,138 @@
+import hashlib
+from collections import Counter
+
+from prompt_budget import estimate_tokens
+
+HEADING_LEVELS = {f"h{level}": level for level in range(1, 7)}
+INTRODUCTION = "Introduction"
+
+
+def section_hash(heading, text):
+    """Returns a stable SHA-256 hex digest of a section's heading and body text."""
+    return hashlib.sha256(f"{heading}\0{text}".encode("utf-8")).hexdigest()
+
+
+def build_section_tree(blocks, cleaned=None):
+    """Splits extracted (tag, text) blocks into sections that start at each heading.
+
+    Each section has its heading, heading level (0 for the text before the first heading,
+    which forms an "Introduction" section), path of enclosing headings, body text (joined
+    from `cleaned`, the blocks' already cleaned texts, if given) and a content hash. Sections without body text are left out,
+    but their headings still appear in the paths of their subsections.
+    """
+    sections = []
+    open_headings = []  # (level, heading) of the enclosing sections
+    current = {"heading": INTRODUCTION, "level": 0, "path": [], "texts": []}
+    for index, (tag, text) in enumerate(blocks):
+        level = HEADING_LEVELS.get(tag)
+        if level is None:
+            current["texts"].append(cleaned[index] if cleaned is not None else text)
+            continue
+        sections.append(current)
+        open_headings = [entry for entry in open_headings if entry[0] < level]
+        current = {"heading": text, "level": level, "path": [heading for _, heading in open_headings], "texts": []}
+        open_headings.append((level, text))
+    sections.append(current)
+
+    tree = []
+    for section in sections:
+        text = " ".join(text for text in section["texts"] if text)
+        if not text.strip():
+            continue
+        tree.append({
+            "heading": section["heading"],
+            "level": section["level"],
+            "path": section["path"],
+            "text": text,
+            "hash": section_hash(section["heading"], text),
+        })
+    return tree
+
+
+def section_text(section):
+    """Returns the section as it reads on the page: its heading followed by its body text."""
+    return section["text"] if section["level"] == 0 else f"{section['heading']}. {section['text']}"
+
+
+def top_level(sections):
+    """Returns the shallowest heading level used by more than one section (the post's main sections).
+
+    A single H1 holding the post title does not count, so posts with one H1 and several H2s
+    are split at the H2s. Returns None for a post with at most one heading at every level.
+    """
+    levels = Counter(section["level"] for section in sections if section["level"])
+    return min((level for level, used in levels.items() if used > 1), default=None)
+
+
+def top_level_units(sections):
+    """Splits sections into the post's top-level sections, each with its subsections.
+
+    Text before the first top-level heading (the introduction and a title H1) forms the
+    first unit. Without a top level, every section is a unit of its own.
+    """
+    top = top_level(sections)
+    units = []
+    for section in sections:
+        if not units or top is None or section["level"] == top or 0 < section["level"] < top:
+            units.append([])
+        units[-1].append(section)
+    return units
+
+
+def _pack(items, sizes, max_tokens):
+    """Greedily packs consecutive items into lists of at most `max_tokens` (an oversized item stays alone)."""
+    packed = []
+    total = 0
+    for item, size in zip(items, sizes):
+        if packed and total + size > max_tokens:
+            packed.append([])
+            total = 0
+        if not packed:
+            packed.append([])
+        packed[-1].append(item)
+        total += size
+    return packed
+
+
+def _is_cut(unit, units_per_group):
+    """Whether a group may end after this unit, decided by its heading alone so edits elsewhere never move it."""
+    digest = hashlib.sha256(unit[0]["heading"].encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % units_per_group == 0
+
+
+def group_sections(sections, max_tokens):
+    """Groups sections for analysis, packing whole top-level sections up to `max_tokens` estimated tokens.
+
+    Group boundaries are anchored to the headings: once a group holds half the budget, it
+    ends after the next top-level section whose heading hashes to a cut point (or earlier,
+    if the next section would not fit). After an edit, boundaries can only move until the
+    next cut point, so the groups past it keep their sections and findings. A top-level
+    section over the budget on its own is split between its subsections.
+    """
+    units = top_level_units(sections)
+    if not units:
+        return []
+    sizes = [sum(estimate_tokens(section_text(section)) for section in unit) for unit in units]
+    typical = sorted(sizes)[len(sizes) // 2]
+    # Spaces cut points to fill the other half of the budget; rounded down to a power of two
+    # so that one edited section rarely changes the spacing
+    units_per_group = 1 << max(0, (max_tokens // 2 // max(1, typical)).bit_length() - 1)
+
+    groups = []
+    current = []
+    current_tokens = 0
+    for unit, size in zip(units, sizes):
+        if current and current_tokens + size > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        if size > max_tokens:
+            groups.extend(_pack(unit, [estimate_tokens(section_text(section)) for section in unit], max_tokens))
+            continue
+        current.extend(unit)
+        current_tokens += size
+        if current_tokens >= max_tokens / 2 and _is_cut(unit, units_per_group):
+            groups.append(current)
+            current, current_tokens = [], 0
+    if current:
+        groups.append(current)
+    return groups
@@ -0,0 +1,163 @@
+"""Headless batch mode for the Blog SEO Analyzer.
+
+Analyzes every URL from a text file or sitemap and streams one JSON line per URL:
+
+    python seo_batch.py --urls urls.txt --output results.jsonl
+    python seo_batch.py --sitemap https://example.com/sitemap.xml --output results.jsonl
+"""
+import argparse
+import json
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+import blog_seo_analyzer as analyzer
+from llm_client import CircuitBreaker, ResilientLLM
+from pipeline_metrics import METRICS, PipelineMetrics, timed, tracing
+from results_store import ResultsStore
+
+
+def read_url_file(path):
+    """Reads one URL per line, skipping blank lines and '#' comments."""
+    with open(path, encoding="utf-8") as handle:
+        lines = (line.strip() for line in handle)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def read_sitemap(location, _depth=0):
+    """Returns page URLs from a sitemap URL or file, following nested sitemap indexes."""
+    if location.startswith(("http://", "https://")):
+        response = requests.get(location, timeout=30)
+        response.raise_for_status()
+        root = ET.fromstring(response.content)
+    else:
+        root = ET.parse(location).getroot()
+
+    urls = []
+    is_index = root.tag.endswith("sitemapindex")
+    for element in root.iter():
+        if element.tag.endswith("loc") and element.text:
+            loc = element.text.strip()
+            if is_index and _depth < 3:
+                urls.extend(read_sitemap(loc, _depth + 1))
+            elif not is_index:
+                urls.append(loc)
+    return urls
+
+
+def analyze_page(url, llm, include_content=False, on_page=None, on_update=None, previous=None, link_checker=None):
+    """Runs the full analysis pipeline for one URL and returns a JSON-serializable record.
+
+    `on_page(page)` is called with the extracted page before any LLM call; if it returns a
+    dict, the record is updated with it and the analysis is skipped. `on_update`,
+    `previous` and `link_checker` are passed on to `run_analysis`.
+    """
+    start = time.perf_counter()
+    record = {"url": url, "status": "ok", "error": None}
+    trace = PipelineMetrics()
+    try:
+        with tracing(trace), timed("pipeline_total"):
+            soup = analyzer.scrape_page_content(url)
+            if soup is None:
+                record.update(status="fetch_error", error="Failed to retrieve page content")
+                return record
+
+            page = analyzer.retrieve_blog_content(url, soup)
+            if not page:
+                record.update(status="extract_error", error="Failed to extract content from the blog")
+                return record
+
+            skip = on_page(page) if on_page else None
+            if skip:
+                record.update(skip)
+                return record
+
+            result = analyzer.run_analysis(
+                page, url, llm, on_update=on_update, previous=previous, link_checker=link_checker
+            )
+        if not include_content:
+            result.pop("content", None)
+        record.update(result)
+        if not all(result["sections"].values()):
+            record["status"] = "partial"  # At least one LLM analysis failed and returned nothing
+    except Exception as e:
+        analyzer.log_error(f"Error in batch analysis of {url}", e)
+        record.update(status="error", error=str(e))
+    finally:
+        record["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+        record["metrics"] = trace.snapshot()
+    return record
+
+
+def build_llm(llm_concurrency=4, llm_rpm=60, llm_tpm=0):
+    """Wraps the chat model in a call layer whose limits are shared by every worker of this run."""
+    return ResilientLLM(
+        analyzer.get_llm(),
+        requests_per_minute=llm_rpm,
+        tokens_per_minute=llm_tpm,
+        max_concurrency=llm_concurrency,
+        max_retries=analyzer.LLM_MAX_RETRIES,
+        breaker=CircuitBreaker(analyzer.LLM_BREAKER_THRESHOLD, analyzer.LLM_BREAKER_RESET),
+    )
+
+
+def run_batch(urls, output, workers=8, llm_concurrency=4, llm_rpm=60, include_content=False, metrics_file=None,
+              llm_tpm=0, store=None):
+    """Analyzes URLs on a worker pool and writes each record to `output` as soon as it finishes.
+
+    Records are also added to the run history `store`, if given. Process-wide metrics are
+    written to `metrics_file` every 50 records and at the end.
+    """
+    llm = build_llm(llm_concurrency, llm_rpm, llm_tpm)
+    counts = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(analyze_page, url, llm, include_content) for url in urls]
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            if store:
+                store.add(record, source="batch")
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+            print(f"[{done}/{len(urls)}] {record['status']}: {record['url']}", file=sys.stderr)
+            if metrics_file and done % 50 == 0:
+                METRICS.write_json(metrics_file)
+    if metrics_file:
+        METRICS.write_json(metrics_file)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze many blog URLs without the Streamlit UI.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--urls", help="Text file with one URL per line")
+    source.add_argument("--sitemap", help="Sitemap URL or local sitemap.xml path")
+    parser.add_argument("--output", required=True, help="JSONL file to write results to")
+    parser.add_argument("--workers", type=int, default=8, help="Pages processed concurrently")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Maximum in-flight LLM calls")
+    parser.add_argument("--llm-rpm", type=float, default=60, help="Maximum LLM calls per minute (0 = unlimited)")
+    parser.add_argument("--llm-tpm", type=float, default=0, help="Maximum estimated prompt tokens per minute (0 = unlimited)")
+    parser.add_argument("--limit", type=int, help="Only analyze the first N URLs")
+    parser.add_argument("--include-content", action="store_true", help="Include extracted page text in results")
+    parser.add_argument("--metrics-file", help="JSON file for per-stage timing and cache metrics")
+    parser.add_argument("--results-db", default=analyzer.RESULTS_DB_PATH, help="Run history database ('' to disable)")
+    args = parser.parse_args(argv)
+
+    urls = read_url_file(args.urls) if args.urls else read_sitemap(args.sitemap)
+    urls = list(dict.fromkeys(urls))[:args.limit]
+    store = ResultsStore(args.results_db) if args.results_db else None
+    with open(args.output, "w", encoding="utf-8") as output:
+        counts = run_batch(
+            urls, output, args.workers, args.llm_concurrency, args.llm_rpm, args.include_content, args.metrics_file,
+            args.llm_tpm, store,
+        )
+    if store:
+        store.close()
+    print(f"Done: {counts}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""Site crawl mode for the Blog SEO Analyzer.
+
+Discovers pages from seed URLs and sitemaps, follows internal links, honors robots.txt
+(including Crawl-delay) and spaces requests to each host, for link status checks as well
+as page fetches. Pages whose content nearly duplicates an already analyzed page are
+recorded without any LLM call. The crawl frontier is kept in SQLite, so running the same
+command again resumes an interrupted crawl:
+
+    python seo_crawler.py --seed https://blog.example.com/ --output crawl.jsonl
+    python seo_crawler.py --sitemap https://blog.example.com/sitemap.xml --output crawl.jsonl --max-pages 500
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+import blog_seo_analyzer as analyzer
+import seo_batch
+from link_analyzer import LinkChecker, classify_links
+from minhash import NearDuplicateIndex
+from pipeline_metrics import METRICS, count
+from results_store import ResultsStore
+
+ROBOTS_AGENT = "BlogSEOAnalyzer"
+SKIPPED_EXTENSIONS = (
+    ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".pdf", ".zip", ".gz",
+    ".mp3", ".mp4", ".webm", ".css", ".js", ".json", ".xml", ".txt",
+)
+# Frontier status for each record status; pending URLs have no record yet
+FRONTIER_STATUS = {"ok": "done", "partial": "done", "duplicate": "duplicate"}
+
+
+def _host(url):
+    return urlparse(url).netloc.lower()
+
+
+def _origin(url):
+    parts = urlparse(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class CrawlFrontier:
+    """Crawl state in SQLite: every discovered URL with its depth and status, and the fingerprints of analyzed pages.
+
+    Only the crawl loop's thread uses the connection.
+    """
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                host TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                note TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS urls_pending ON urls (status, depth);
+            CREATE TABLE IF NOT EXISTS fingerprints (url TEXT PRIMARY KEY, signature TEXT NOT NULL);
+        """)
+        # Pages that were being analyzed when a previous run stopped are crawled again
+        self._db.execute("UPDATE urls SET status = 'pending' WHERE status = 'in_progress'")
+        self._db.commit()
+
+    def add(self, urls, depth):
+        """Adds URLs not seen before; returns how many were new."""
+        now = time.time()
+        cursor = self._db.executemany(
+            "INSERT OR IGNORE INTO urls (url, host, depth, updated_at) VALUES (?, ?, ?, ?)",
+            [(url, _host(url), depth, now) for url in urls],
+        )
+        self._db.commit()
+        return cursor.rowcount
+
+    def pending(self, limit=500):
+        """Returns (url, host, depth) of pending URLs, shallowest first."""
+        return self._db.execute(
+            "SELECT url, host, depth FROM urls WHERE status = 'pending' ORDER BY depth, rowid LIMIT ?", (limit,)
+        ).fetchall()
+
+    def mark(self, url, status, note=None):
+        self._db.execute(
+            "UPDATE urls SET status = ?, note = ?, updated_at = ? WHERE url = ?", (status, note, time.time(), url)
+        )
+        self._db.commit()
+
+    def status(self, url):
+        row = self._db.execute("SELECT status FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def requeue_duplicates_of(self, url):
+        """Sets pages recorded as duplicates of `url` back to pending; returns how many there were."""
+        cursor = self._db.execute(
+            "UPDATE urls SET status = 'pending', note = NULL, updated_at = ? WHERE status = 'duplicate' AND note = ?",
+            (time.time(), url),
+        )
+        self._db.commit()
+        return cursor.rowcount
+
+    def counts(self):
+        return dict(self._db.execute("SELECT status, COUNT(*) FROM urls GROUP BY status"))
+
+    def store_fingerprint(self, url, signature):
+        self._db.execute("INSERT OR REPLACE INTO fingerprints VALUES (?, ?)", (url, json.dumps(signature)))
+        self._db.commit()
+
+    def fingerprints(self):
+        for url, signature in self._db.execute("SELECT url, signature FROM fingerprints"):
+            yield url, json.loads(signature)
+
+    def close(self):
+        self._db.close()
+
+
+class RobotsPolicy:
+    """Fetches and caches robots.txt per origin; answers whether a URL may be crawled, its crawl delay and sitemaps.
+
+    As recommended for crawlers, a robots.txt answering 401/403 disallows the whole site and
+    any other client error or an unreachable file allows it.
+    """
+
+    def __init__(self, session, user_agent=ROBOTS_AGENT, timeout=10):
+        self.session = session
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self._parsers = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _parser(self, url):
+        origin = _origin(url)
+        with self._lock:
+            lock = self._locks.setdefault(origin, threading.Lock())
+        # One fetch per origin; a slow robots.txt only holds up requests to its own site
+        with lock:
+            if origin in self._parsers:
+                return self._parsers[origin]
+            parser = RobotFileParser(f"{origin}/robots.txt")
+            try:
+                response = self.session.get(parser.url, timeout=self.timeout)
+                if response.status_code in (401, 403):
+                    parser.disallow_all = True
+                elif response.status_code >= 400:
+                    parser.allow_all = True
+                else:
+                    parser.parse(response.text.splitlines())
+            except requests.exceptions.RequestException as e:
+                analyzer.log_error(f"Error fetching {parser.url}", e)
+                parser.allow_all = True
+            self._parsers[origin] = parser
+            return parser
+
+    def can_fetch(self, url):
+        return self._parser(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        """Seconds to wait between requests to the URL's host as asked by robots.txt, or 0."""
+        parser = self._parser(url)
+        delay = parser.crawl_delay(self.user_agent)
+        if delay is None:
+            rate = parser.request_rate(self.user_agent)
+            delay = rate.seconds / rate.requests if rate and rate.requests else 0
+        return float(delay)
+
+    def sitemaps(self, url):
+        return self._parser(url).site_maps() or []
+
+
+class PolitenessScheduler:
+    """Spaces request starts to each host by that host's delay; shared by page fetches and link checks."""
+
+    def __init__(self):
+        self._next_start = {}
+        self._lock = threading.Lock()
+
+    def wait_time(self, host):
+        """Seconds until the next request to `host` may start."""
+        with self._lock:
+            return max(0.0, self._next_start.get(host, 0.0) - time.monotonic())
+
+    def started(self, host, delay):
+        with self._lock:
+            self._next_start[host] = time.monotonic() + delay
+
+    def reserve(self, host, delay):
+        """Books the next request slot for `host` and returns the seconds to wait until it starts."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, 0.0))
+            self._next_start[host] = start + delay
+            return start - now
+
+
+class CrawlLinkChecker(LinkChecker):
+    """Link status checks that follow the crawl's rules.
+
+    Links on the crawled hosts and on other hosts alike are only checked where robots.txt
+    allows it, and requests to each host are spaced by the same scheduler and delay as page
+    fetches. Disallowed links are reported as not checked.
+    """
+
+    def __init__(self, robots, scheduler, delay, **kwargs):
+        super().__init__(**kwargs)
+        self.robots = robots
+        self.scheduler = scheduler
+        self.delay = delay
+
+    def before_request(self, url):
+        if not self.robots.can_fetch(url):
+            count("crawl_link_checks_skipped")
+            return False
+        time.sleep(self.scheduler.reserve(_host(url), max(self.delay, self.robots.crawl_delay(url))))
+        return True
+
+
+def _crawlable(url, hosts):
+    path = urlparse(url).path.lower()
+    return _host(url) in hosts and not path.endswith(SKIPPED_EXTENSIONS)
+
+
+def crawl_page(url, llm, index, include_content=False, link_checker=None):
+    """Analyzes one page unless it nearly duplicates an indexed page.
+
+    Returns (record, internal link URLs, MinHash signature or None for duplicates).
+    """
+    found = {"links": [], "signature": None}
+
+    def on_page(page):
+        found["links"] = [link["url"] for link in classify_links(page["links"], url) if link["internal"]]
+        signature, duplicate = index.check_and_add(url, page["content"])
+        if duplicate:
+            count("crawl_duplicates_skipped")
+            return {"status": "duplicate", "duplicate_of": duplicate[0], "similarity": round(duplicate[1], 3)}
+        found["signature"] = signature
+        return None
+
+    record = seo_batch.analyze_page(url, llm, include_content, on_page, link_checker=link_checker)
+    return record, found["links"], found["signature"]
+
+
+def discover_sitemaps(seeds, sitemaps, robots):
+    """Returns the given sitemaps plus those listed in each seed host's robots.txt (or its /sitemap.xml)."""
+    locations = list(sitemaps)
+    for origin in dict.fromkeys(_origin(url) for url in seeds):
+        locations += robots.sitemaps(origin + "/") or [origin + "/sitemap.xml"]
+    return list(dict.fromkeys(locations))
+
+
+def run_crawl(seeds, sitemaps, output, state_path, workers=4, max_pages=200, max_depth=3, delay=1.0,
+              similarity=0.9, llm_concurrency=4, llm_rpm=60, llm_tpm=0, include_content=False, metrics_file=None,
+              store=None):
+    """Crawls from `seeds` and `sitemaps`, writing each page's record to `output` as soon as it finishes.
+
+    Records are also added to the run history `store`, if given. Only hosts of the seeds and sitemaps are crawled. `max_pages` counts pages finished in
+    earlier runs with the same state file. Returns the record counts per status.
+    """
+    llm = seo_batch.build_llm(llm_concurrency, llm_rpm, llm_tpm)
+    robots = RobotsPolicy(analyzer.get_page_fetcher().session)
+    frontier = CrawlFrontier(state_path)
+    index = NearDuplicateIndex(threshold=similarity)
+    for url, signature in frontier.fingerprints():
+        index.add(url, signature)
+
+    hosts = {_host(url) for url in seeds}
+    hosts |= {_host(location) for location in sitemaps if location.startswith(("http://", "https://"))}
+    frontier.add([url for url in seeds if _crawlable(url, hosts)], 0)
+    for location in discover_sitemaps(seeds, sitemaps, robots):
+        try:
+            urls = seo_batch.read_sitemap(location)
+        except Exception as e:
+            analyzer.log_error(f"Error reading sitemap {location}", e)
+            continue
+        frontier.add([url for url in urls if _crawlable(url, hosts)], 0)
+
+    scheduler = PolitenessScheduler()
+    link_checker = CrawlLinkChecker(
+        robots, scheduler, delay, session=analyzer.get_page_fetcher().session,
+        timeout=analyzer.LINK_CHECK_TIMEOUT, per_host_limit=analyzer.LINK_CHECK_PER_HOST,
+    ) if analyzer.LINK_CHECK else None
+
+    finished = frontier.counts()
+    done = sum(number for status, number in finished.items() if status not in ("pending", "blocked"))
+    counts = {}
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while True:
+            retry_in = None
+            for url, host, depth in frontier.pending() if done + len(in_flight) < max_pages else []:
+                if len(in_flight) >= workers or done + len(in_flight) >= max_pages:
+                    break
+                if not robots.can_fetch(url):
+                    frontier.mark(url, "blocked", "robots.txt")
+                    count("crawl_robots_blocked")
+                    continue
+                wait_time = scheduler.wait_time(host)
+                if wait_time > 0:
+                    retry_in = wait_time if retry_in is None else min(retry_in, wait_time)
+                    continue
+                scheduler.started(host, max(delay, robots.crawl_delay(url)))
+                frontier.mark(url, "in_progress")
+                future = executor.submit(crawl_page, url, llm, index, include_content, link_checker)
+                in_flight[future] = (url, depth)
+
+            if not in_flight:
+                if retry_in is None:
+                    break  # Nothing left to crawl, or the page limit is reached
+                time.sleep(retry_in)
+                continue
+
+            completed, _ = wait(in_flight, timeout=retry_in, return_when=FIRST_COMPLETED)
+            for future in completed:
+                url, depth = in_flight.pop(future)
+                record, links, signature = future.result()
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                if store:
+                    store.add(record, source="crawl")
+                # Only analyzed pages serve as originals: pages matched against one that failed are analyzed after all
+                status = FRONTIER_STATUS.get(record["status"], "error")
+                requeued = 0
+                if status == "duplicate" and frontier.status(record["duplicate_of"]) == "error":
+                    status, requeued = "pending", 1
+                frontier.mark(url, status, record.get("duplicate_of") or record.get("error"))
+                if signature and status == "done":
+                    frontier.store_fingerprint(url, signature)
+                elif signature:
+                    index.remove(url)
+                    requeued += frontier.requeue_duplicates_of(url)
+                count("crawl_duplicates_requeued", requeued)
+                if depth < max_depth:
+                    new = frontier.add([link for link in dict.fromkeys(links) if _crawlable(link, hosts)], depth + 1)
+                    count("crawl_urls_discovered", new)
+                done += 1 - requeued  # Requeued pages are not finished
+                counts[record["status"]] = counts.get(record["status"], 0) + 1
+                print(f"[{done}/{max_pages}] {record['status']}: {url}", file=sys.stderr)
+                if metrics_file and done % 50 == 0:
+                    METRICS.write_json(metrics_file)
+    frontier.close()
+    if metrics_file:
+        METRICS.write_json(metrics_file)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl a blog and analyze its pages without the Streamlit UI.")
+    parser.add_argument("--seed", action="append", default=[], help="Start URL (repeatable)")
+    parser.add_argument("--sitemap", action="append", default=[], help="Sitemap URL or local sitemap.xml path (repeatable)")
+    parser.add_argument("--output", required=True, help="JSONL file results are appended to")
+    parser.add_argument("--state", default="crawl_state.sqlite3", help="SQLite file holding the resumable crawl state")
+    parser.add_argument("--workers", type=int, default=4, help="Pages processed concurrently")
+    parser.add_argument("--max-pages", type=int, default=200, help="Stop after this many pages, including earlier runs")
+    parser.add_argument("--max-depth", type=int, default=3, help="Link hops to follow from seed and sitemap URLs")
+    parser.add_argument("--delay", type=float, default=1.0, help="Minimum seconds between requests to a host")
+    parser.add_argument("--similarity", type=float, default=0.9, help="Estimated similarity at which a page counts as a duplicate")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Maximum in-flight LLM calls")
+    parser.add_argument("--llm-rpm", type=float, default=60, help="Maximum LLM calls per minute (0 = unlimited)")
+    parser.add_argument("--llm-tpm", type=float, default=0, help="Maximum estimated prompt tokens per minute (0 = unlimited)")
+    parser.add_argument("--include-content", action="store_true", help="Include extracted page text in results")
+    parser.add_argument("--metrics-file", help="JSON file for per-stage timing and cache metrics")
+    parser.add_argument("--results-db", default=analyzer.RESULTS_DB_PATH, help="Run history database ('' to disable)")
+    args = parser.parse_args(argv)
+    if not args.seed and not args.sitemap:
+        parser.error("at least one --seed or --sitemap is required")
+
+    store = ResultsStore(args.results_db) if args.results_db else None
+    with open(args.output, "a", encoding="utf-8") as output:
+        counts = run_crawl(
+            args.seed, args.sitemap, output, args.state, args.workers, args.max_pages, args.max_depth, args.delay,
+            args.similarity, args.llm_concurrency, args.llm_rpm, args.llm_tpm, args.include_content, args.metrics_file,
+            store,
+        )
+    if store:
+        store.close()
+    print(f"Done: {counts}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import json
+from dataclasses import dataclass, field
+
+# Guidelines per analysis section: (name, what the model should assess), in display order. Guidelines
+# that can be measured from the HTML are computed by onpage_metrics instead.
+GUIDELINES = {
+    "keyword_optimization": [
+        ("Keyword and Search Intent Alignment", "How well the content fits the target keyword and satisfies the search intent, and how well the page title targets it."),
+        ("Page Title Engagement", "How likely the page title is to engage users and attract clicks in search results."),
+        ("Page Title Modifiers", "Whether a temporal modifier such as a year would help, given click-worthiness and length."),
+        ("Meta Description Engagement", "How compelling the meta description is for searchers."),
+        ("Variations and LSI Keywords", "Use of variations of the primary keyword and synonyms (LSI keywords) throughout the content."),
+    ],
+    "content_quality": [
+        ("Spelling and Grammar", "Spacing, spelling and grammatical errors; state clearly whether any were found."),
+        ("Scannability", "How headings, bullet points and other elements make the content easy to scan, with examples."),
+        ("Readability", "Overly complex sentences or sections, and whether the content meets an 8th-grade reading level."),
+        ("Engagement", "How the content captures and keeps the reader's attention; note engaging or disengaging parts."),
+        ("Heading Clarity", "Whether headings are descriptive and reflect the topic of each section."),
+        ("Keyword Usage", "Use, relevance and frequency of keyword variations, LSI keywords and synonyms in headings and content."),
+        ("Originality and Relevance", "Originality, relevance to current trends, accuracy and depth of research."),
+    ],
+    "link_evaluation": [
+        ("Internal Links", "How many internal links were found and in which page regions."),
+        ("Descriptive Anchor Text", "Whether internal links use descriptive anchor text, with examples, using the generic/empty anchor counts."),
+        ("Internal Link Optimization", "Whether important internal links are placed early in the body content."),
+        ("Breadcrumbs", "Whether breadcrumbs were found and include at least \"Home\" and \"Blog\"."),
+        ("Usefulness of Internal Links", "Whether internal links point to related content that helps the user."),
+        ("Preferred URLs for Internal Links", "Whether links to the same page consistently use one canonical URL format."),
+        ("External Links", "How many external links were found, where, and whether they point to relevant sources."),
+        ("Affiliate and Sponsored Links", "Whether affiliate or sponsored links appear and are marked nofollow or sponsored."),
+        ("External Links Opening in New Window", "How many external links use target=_blank and whether they lack rel=noopener."),
+        ("Broken Links", "How many links were checked and which are broken; say so if no check was performed."),
+    ],
+}
+
+COMBINED_PROMPT = """Analyze the blog post below for SEO keyword optimization, content quality and link structure. For every guideline, give a detailed, accurate, fact-based analysis of how well the page adheres to it, and specific, actionable suggestions to improve SEO performance and user engagement, or 'No Suggestions' if there are none. Rely on the keyword statistics and link data, which were computed from the page's HTML, instead of estimating counts. Do not include concluding statements or summaries.
+
+Respond with a JSON object with the keys "keyword_optimization", "content_quality" and "link_evaluation". Each is an array with one object per guideline of that section, in the listed order, with the string fields "guideline" (the guideline name exactly as listed), "analysis" and "suggestions".
+
+Guidelines:
+{guidelines}
+
+Page Title:
+{page_title}
+
+Meta Description:
+{meta_description}
+
+URL:
+{url}
+
+Keyword Statistics:
+{keyword_stats}
+
+Link Data:
+{link_summary}
+
+Content:
+{content}
+"""
+
+
+@dataclass
+class Finding:
+    """The model's assessment of one guideline."""
+
+    guideline: str
+    analysis: str
+    suggestions: str = "No Suggestions"
+
+    def as_pair(self):
+        """Returns the (analysis, suggestions) pair the result views render."""
+        return f"{self.guideline}: {self.analysis}", self.suggestions
+
+
+@dataclass
+class StructuredAnalysis:
+    """Findings per analysis section; sections the response did not cover are left empty."""
+
+    keyword_optimization: list = field(default_factory=list)
+    content_quality: list = field(default_factory=list)
+    link_evaluation: list = field(default_factory=list)
+
+    def sections(self):
+        """Returns {section key: [(analysis, suggestions), ...]} for every section that has findings."""
+        return {
+            key: [finding.as_pair() for finding in getattr(self, key)]
+            for key in GUIDELINES
+            if getattr(self, key)
+        }
+
+
+def response_schema():
+    """JSON schema for the combined response, passed to Gemini as its response schema."""
+    finding = {
+        "type": "object",
+        "properties": {
+            "guideline": {"type": "string"},
+            "analysis": {"type": "string"},
+            "suggestions": {"type": "string"},
+        },
+        "required": ["guideline", "analysis", "suggestions"],
+    }
+    return {
+        "type": "object",
+        "properties": {key: {"type": "array", "items": finding} for key in GUIDELINES},
+        "required": list(GUIDELINES),
+    }
+
+
+def build_combined_prompt(content, page_title, meta_description, url, keyword_stats, link_summary):
+    guidelines = "\n".join(
+        f"{key}:\n" + "\n".join(f"- {name}: {description}" for name, description in entries)
+        for key, entries in GUIDELINES.items()
+    )
+    return COMBINED_PROMPT.format(
+        guidelines=guidelines,
+        page_title=page_title,
+        meta_description=meta_description,
+        url=url,
+        keyword_stats=keyword_stats,
+        link_summary=link_summary,
+        content=content,
+    )
+
+
+def parse_structured_response(text):
+    """Validates the combined JSON response and returns a StructuredAnalysis.
+
+    Findings for unknown guidelines or with non-string fields are dropped, and findings are
+    put in guideline order. Raises ValueError if the response is not a JSON object.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        # Tolerate a Markdown code fence around the JSON
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Response is not valid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("Response is not a JSON object")
+
+    analysis = StructuredAnalysis()
+    for key, entries in GUIDELINES.items():
+        order = {name.lower(): (index, name) for index, (name, _) in enumerate(entries)}
+        findings = {}
+        items = data.get(key)
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            guideline, text, suggestions = (item.get(name) for name in ("guideline", "analysis", "suggestions"))
+            if not isinstance(guideline, str) or not isinstance(text, str) or guideline.strip().lower() not in order:
+                continue
+            index, name = order[guideline.strip().lower()]
+            suggestions = suggestions.strip() if isinstance(suggestions, str) else ""
+            findings.setdefault(index, Finding(name, text.strip(), suggestions or "No Suggestions"))
+        setattr(analysis, key, [findings[index] for index in sorted(findings)])
+    return analysis
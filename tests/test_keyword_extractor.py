@@ -0,0 +1,80 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from keyword_extractor import KeywordExtractor  # noqa: E402
+
+
+class GatedPipeline:
+    """Wraps a spaCy pipeline, records the size of every pipe call and holds the first one until released."""
+
+    def __init__(self, nlp):
+        self.nlp = nlp
+        self.calls = []
+        self.release = threading.Event()
+
+    def __getattr__(self, name):
+        return getattr(self.nlp, name)
+
+    def pipe(self, texts, **kwargs):
+        texts = list(texts)
+        self.calls.append(len(texts))
+        self.release.wait(5)
+        return self.nlp.pipe(texts, **kwargs)
+
+
+def page(index):
+    return {
+        "title": f"Post {index} about SEO tips",
+        "meta_description": "Practical SEO tips",
+        "blocks": [("h1", "SEO tips"), ("p", f"Good SEO tips help blogs rank. Tip {index} covers keyword research.")],
+    }, f"https://blog.example.com/seo-tips-{index}"
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def run_concurrently(extractor, pipeline, pages):
+    """Starts one worker per page and releases the first batch once every other page is queued behind it."""
+    with ThreadPoolExecutor(len(pages)) as pool:
+        futures = [pool.submit(extractor.analyze, *pages[0])]
+        wait_until(lambda: pipeline.calls)
+        futures += [pool.submit(extractor.analyze, *item) for item in pages[1:]]
+        wait_until(lambda: len(extractor._pending) == len(pages) - 1)
+        pipeline.release.set()
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_concurrent_pages_share_batches_and_get_their_own_results():
+    pages = [page(index) for index in range(8)]
+    expected = KeywordExtractor(spacy.blank("en")).analyze_many(pages)
+    pipeline = GatedPipeline(spacy.blank("en"))
+    extractor = KeywordExtractor(pipeline)
+
+    results = run_concurrently(extractor, pipeline, pages)
+
+    assert results == expected
+    # One batch for the first page, one for the seven queued behind it; two pipe calls each
+    assert pipeline.calls == [1, 3, 7, 21]
+
+
+def test_a_failing_page_only_fails_itself():
+    pages = [page(index) for index in range(4)]
+    expected = KeywordExtractor(spacy.blank("en")).analyze_many(pages)
+    pages.insert(2, ({"title": None, "meta_description": None, "blocks": 5}, "https://blog.example.com/broken"))
+    pipeline = GatedPipeline(spacy.blank("en"))
+    extractor = KeywordExtractor(pipeline)
+
+    results = run_concurrently(extractor, pipeline, pages)
+
+    assert isinstance(results[2], TypeError)
+    assert results[:2] + results[3:] == expected
+    assert not extractor._running and not extractor._pending
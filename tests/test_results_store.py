@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from results_store import ResultsStore
+
+
+def record(url, status="ok", lines=None, ease=60.0):
+    return {
+        "url": url,
+        "status": status,
+        "readability": {"grade": 8.0, "ease": ease},
+        "sections": {"content_quality": lines or [("Scannability: Short paragraphs.", "No Suggestions")]},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite3"))
+    yield store
+    store.close()
+
+
+def stored_urls(store):
+    return [row["url"] for row in store._query("SELECT url FROM runs ORDER BY id")]
+
+
+def test_a_bad_record_is_rolled_back_alone_and_the_writer_keeps_going(store):
+    store.add(record("https://blog.example.com/a"), "batch")
+    store.add(record("https://blog.example.com/bad", lines=[("Only an analysis",)]), "batch")
+    store.add({"no_url": True}, "batch")
+    store.add(record("https://blog.example.com/b"), "batch")
+
+    assert store.flush(timeout=5)
+    assert stored_urls(store) == ["https://blog.example.com/a", "https://blog.example.com/b"]
+    assert store._query("SELECT COUNT(*) AS n FROM findings") == [{"n": 2}]
+    assert store._query("SELECT url FROM latest_runs ORDER BY url") == [
+        {"url": "https://blog.example.com/a"}, {"url": "https://blog.example.com/b"},
+    ]
+
+    store.add(record("https://blog.example.com/c"), "batch")
+    assert store.flush(timeout=5)
+    assert stored_urls(store)[-1] == "https://blog.example.com/c"
+
+
+def test_failed_runs_are_stored_but_do_not_replace_the_latest_run(store):
+    store.add(record("https://blog.example.com/a", ease=70.0), "crawl")
+    store.add(record("https://blog.example.com/a", status="fetch_error", ease=None), "crawl")
+    store.add(record("https://blog.example.com/a", status="partial", ease=50.0), "crawl")
+
+    assert store.flush(timeout=5)
+    assert [run["status"] for run in store.history("https://blog.example.com/a")] == ["partial", "fetch_error", "ok"]
+    assert store._query("SELECT ease, previous_ease FROM latest_runs") == [{"ease": 50.0, "previous_ease": 70.0}]
+
+
+def test_flush_gives_up_after_its_timeout(store, monkeypatch):
+    release = threading.Event()
+    insert = ResultsStore._insert
+
+    def slow_insert(conn, *args):
+        release.wait(5)
+        insert(conn, *args)
+
+    monkeypatch.setattr(store, "_insert", slow_insert)
+    store.add(record("https://blog.example.com/a"), "app")
+
+    assert not store.flush(timeout=0.05)
+    release.set()
+    assert store.flush(timeout=5)
+    assert stored_urls(store) == ["https://blog.example.com/a"]
@@ -0,0 +1,70 @@
+from prompt_budget import estimate_tokens
+from section_tree import build_section_tree, group_sections, section_text
+
+WORD = "readable "
+
+
+def post(words_per_section, subsections=0):
+    blocks = [("h1", "Post title"), ("p", WORD * 50)]
+    for index, words in enumerate(words_per_section):
+        blocks += [("h2", f"Section {index}"), ("p", WORD * words)]
+        for sub in range(subsections):
+            blocks += [("h3", f"Section {index}.{sub}"), ("p", WORD * words)]
+    return build_section_tree(blocks)
+
+
+def group_hashes(sections, max_tokens=2000):
+    return [tuple(section["hash"] for section in group) for group in group_sections(sections, max_tokens)]
+
+
+def unchanged_groups(before, after):
+    return [group for group in after if group in before]
+
+
+def test_growing_one_section_keeps_every_other_group():
+    before = group_hashes(post([600] * 8))
+    after = group_hashes(post([1000] + [600] * 7))
+
+    assert len(unchanged_groups(before, after)) == len(before) - 1
+
+
+def test_editing_a_subsection_only_regroups_its_top_level_section():
+    original = post([300] * 4, subsections=3)
+    edited = post([300, 300, 900, 300], subsections=3)
+    edited_hashes = {section["hash"] for section in edited if section["heading"].startswith("Section 2")}
+
+    before = group_hashes(original)
+    after = group_hashes(edited)
+
+    assert [group for group in after if not edited_hashes & set(group)] == unchanged_groups(before, after)
+    assert len(unchanged_groups(before, after)) == len(before) - 2  # Section 2 was packed into two groups
+
+
+def test_subsections_are_packed_up_to_the_budget():
+    groups = group_sections(post([300, 300], subsections=3), max_tokens=2000)
+
+    assert [[section["heading"] for section in group] for group in groups] == [
+        ["Post title"],
+        ["Section 0", "Section 0.0"],
+        ["Section 0.1", "Section 0.2"],
+        ["Section 1", "Section 1.0"],
+        ["Section 1.1", "Section 1.2"],
+    ]
+
+
+def test_short_top_level_sections_are_packed_together():
+    sections = post([100] * 12)
+    groups = group_sections(sections, max_tokens=2000)
+
+    assert len(groups) == 2
+    assert all(group[0]["level"] <= 2 for group in groups)
+    assert all(sum(estimate_tokens(section_text(section)) for section in group) <= 2000 for group in groups)
+    assert [section for group in groups for section in group] == sections
+
+
+def test_editing_a_short_section_keeps_the_groups_past_the_next_cut():
+    before = group_hashes(post([100] * 12))
+    for edited in range(12):
+        after = group_hashes(post([100] * edited + [160] + [100] * (11 - edited)))
+
+        assert len(after) - len(unchanged_groups(before, after)) <= 2
@@ -0,0 +1,106 @@
+import io
+import threading
+
+import pytest
+
+import blog_seo_analyzer as analyzer
+import seo_batch
+import seo_crawler
+from seo_crawler import CrawlFrontier
+
+CONTENT = "A long post about writing blog titles that people click and search engines understand. " * 20
+
+
+class AllowAll:
+    def __init__(self, session):
+        pass
+
+    def can_fetch(self, url):
+        return True
+
+    def crawl_delay(self, url):
+        return 0
+
+
+@pytest.fixture
+def crawl(monkeypatch, tmp_path):
+    """Runs a crawl where `pages` maps each URL to (links, analysis status, hooks run before and after extraction)."""
+    monkeypatch.setattr(seo_batch, "build_llm", lambda *args: None)
+    monkeypatch.setattr(seo_crawler, "RobotsPolicy", AllowAll)
+    monkeypatch.setattr(seo_crawler, "discover_sitemaps", lambda *args: [])
+    monkeypatch.setattr(analyzer, "LINK_CHECK", False)
+    state = str(tmp_path / "crawl.sqlite3")
+
+    def run(seeds, pages, workers=1):
+        def analyze_page(url, llm, include_content=False, on_page=None, link_checker=None):
+            links, status, before, after = pages[url]
+            record = {"url": url, "status": "ok", "error": None}
+            if before:
+                before()
+            skip = on_page({"links": [{"href": link} for link in links], "content": CONTENT})
+            if skip:
+                record.update(skip)
+            elif status != "ok":
+                record.update(status=status, error="analysis failed")
+            if after:
+                after(record)
+            return record
+
+        monkeypatch.setattr(seo_batch, "analyze_page", analyze_page)
+        output = io.StringIO()
+        counts = seo_crawler.run_crawl(seeds, [], output, state, workers=workers, delay=0)
+        frontier = CrawlFrontier(state)
+        statuses = {url: frontier.status(url) for url in pages}
+        fingerprints = [url for url, _ in frontier.fingerprints()]
+        frontier.close()
+        return counts, statuses, fingerprints
+
+    return run
+
+
+def test_a_failed_page_is_not_an_original_for_later_pages(crawl):
+    counts, statuses, fingerprints = crawl(["https://blog.example.com/a"], {
+        "https://blog.example.com/a": (["/b"], "error", None, None),
+        "https://blog.example.com/b": ([], "ok", None, None),
+    })
+
+    assert counts == {"error": 1, "ok": 1}
+    assert statuses == {"https://blog.example.com/a": "error", "https://blog.example.com/b": "done"}
+    assert fingerprints == ["https://blog.example.com/b"]
+
+
+def test_duplicates_of_a_page_that_fails_are_analyzed_after_all(crawl):
+    original_indexed = threading.Event()
+    duplicate_found = threading.Event()
+
+    def fail_once_the_duplicate_is_found(record):
+        original_indexed.set()
+        assert duplicate_found.wait(5)
+
+    def note_duplicate(record):
+        if record["status"] == "duplicate":
+            duplicate_found.set()
+
+    # The copy is extracted once the original is indexed, so it is first recorded as its duplicate
+    pages = {
+        "https://blog.example.com/a": ([], "error", None, fail_once_the_duplicate_is_found),
+        "https://blog.example.com/b": ([], "ok", lambda: original_indexed.wait(5), note_duplicate),
+    }
+    counts, statuses, fingerprints = crawl(list(pages), pages, workers=2)
+
+    assert counts == {"error": 1, "duplicate": 1, "ok": 1}
+    assert statuses == {"https://blog.example.com/a": "error", "https://blog.example.com/b": "done"}
+    assert fingerprints == ["https://blog.example.com/b"]
+
+
+def test_requeue_duplicates_of_only_resets_that_pages_duplicates(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "crawl.sqlite3"))
+    frontier.add(["https://blog.example.com/a", "https://blog.example.com/b", "https://blog.example.com/c"], 0)
+    frontier.mark("https://blog.example.com/b", "duplicate", "https://blog.example.com/a")
+    frontier.mark("https://blog.example.com/c", "duplicate", "https://blog.example.com/x")
+
+    assert frontier.requeue_duplicates_of("https://blog.example.com/a") == 1
+    assert frontier.status("https://blog.example.com/b") == "pending"
+    assert frontier.status("https://blog.example.com/c") == "duplicate"
+    assert frontier.status("https://blog.example.com/missing") is None
+    frontier.close()
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from bench_cleaning import NOISE, legacy_clean, make_document  # noqa: E402
+from text_cleaner import TextCleaner  # noqa: E402
+
+SAMPLES = NOISE + [
+    "Lorem ipsum dolor sit amet。 Next sentence stays.",
+    "SAMPLE CONTENT goes here. Real text (with a note) and [a reference] stay readable.",
+    "Tabs\tand\nnewlines and separators  collapse.",
+    "Quotes \u2018single\u2019 and \u201cdouble\u201d, dashes \u2013 and \u2014, ellipsis\u2026 and emoji \U0001F600 go.",
+    "\ufeffByte order mark, zero\u200bwidth and bullets \u2022 are dropped; it's e-mail 50/50?",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_matches_the_legacy_cleaner(text):
+    assert TextCleaner(cache_size=0).clean(text) == legacy_clean(text)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_the_legacy_cleaner_on_noisy_documents(seed):
+    document = make_document(2000, seed=seed)
+
+    assert TextCleaner(cache_size=0).clean(document) == legacy_clean(document)
+
+
+def test_memoized_results_match_fresh_ones():
+    cleaner = TextCleaner(cache_size=2)
+    documents = [make_document(200, seed=seed) for seed in range(4)]
+
+    first = [cleaner.clean(document) for document in documents]
+    again = [cleaner.clean(document) for document in reversed(documents)]
+
+    assert again[::-1] == first == [legacy_clean(document) for document in documents]
+
+
+def test_site_rules_only_apply_to_their_host_and_subdomains():
+    cleaner = TextCleaner({"example.com": [r"Subscribe now.*?\."]})
+    text = "Subscribe now to our list. Keep this."
+
+    assert cleaner.clean(text, "https://www.example.com/post") == "Keep this."
+    assert cleaner.clean(text, "https://blog.example.com/post") == "Keep this."
+    assert cleaner.clean(text, "https://example.org/post") == text
+    assert cleaner.clean(text) == text
@@ -0,0 +1,79 @@
+import json
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+# Placeholder sentences, removed up to the next full stop (the lookahead skips the
+# case-insensitive match attempt at positions that cannot start a placeholder)
+PLACEHOLDER_PATTERN = re.compile(r"(?=[LlSs])(?i:Lorem ipsum|Sample content).*?[.。]")
+# Everything except word characters, . , ! ? ' - / and the whitespace characters that sit
+# outside the U+2000-U+206F punctuation block. One negated class covers both the special
+# character rule and the Unicode punctuation/whitespace rule (and drops brackets/parentheses)
+UNWANTED_CHARS_PATTERN = re.compile(r"[^\w\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u3000.,!?'\-/]+")
+
+
+class TextCleaner:
+    """Precompiled, memoized text cleaner behind `clean_placeholder_text`.
+
+    The general rules run in three passes (placeholder sentences, unwanted characters,
+    whitespace normalization). Site-specific rules are compiled once per host and only run
+    for pages on that host. Results are memoized per (text, site rules).
+    """
+
+    def __init__(self, site_rules=None, cache_size=256):
+        self.site_rules = {
+            host.lower(): [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for host, patterns in (site_rules or {}).items()
+        }
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, path, cache_size=256):
+        """Builds a cleaner with site rules loaded from a JSON file mapping hosts to regex lists."""
+        try:
+            with open(path, encoding="utf-8") as handle:
+                site_rules = json.load(handle)
+        except FileNotFoundError:
+            site_rules = {}
+        return cls(site_rules, cache_size=cache_size)
+
+    def rules_for(self, url):
+        """Returns the compiled site rules for a URL or bare host name, including parent domains."""
+        if not url or not self.site_rules:
+            return None
+        host = (urlparse(url).hostname if "//" in url else url).lower()
+        if host.startswith("www."):
+            host = host[4:]
+        labels = host.split(".")
+        for i in range(len(labels) - 1):
+            rules = self.site_rules.get(".".join(labels[i:]))
+            if rules:
+                return rules
+        return None
+
+    def clean(self, content, url=None):
+        """Cleans unwanted placeholder text and special characters from content, preserving contractions."""
+        rules = self.rules_for(url)
+        key = (content, id(rules) if rules else None)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        content = PLACEHOLDER_PATTERN.sub("", content)
+        content = UNWANTED_CHARS_PATTERN.sub("", content)
+        for pattern in rules or ():
+            content = pattern.sub("", content)
+        # Normalize runs of whitespace to single spaces and trim the ends
+        cleaned = " ".join(content.split())
+
+        if self.cache_size:
+            with self._lock:
+                self._cache[key] = cleaned
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return cleaned